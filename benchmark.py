@@ -0,0 +1,153 @@
+"""
+Script para comparar el rendimiento de los backends de PDF Toolkit
+
+Uso:
+    python benchmark.py                      # Documento sintético de 2000 páginas
+    python benchmark.py doc1.pdf doc2.pdf    # Tu propio corpus
+
+La fusión se mide siempre con dos cargas sintéticas: muchos PDFs pequeños
+y pocos PDFs grandes.
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from pdf_merger import PDFMerger, MERGE_BACKENDS
+from splitter import PDFSplitter, SPLIT_BACKENDS
+
+# Cargas de fusión: (nombre, número de PDFs, páginas de cada uno)
+MERGE_WORKLOADS = [
+    ("muchos pequeños", 500, 1),
+    ("pocos grandes", 5, 1000),
+]
+
+
+def make_sample_pdf(path, pages=2000):
+    """Crea un PDF de prueba con texto y una imagen compartida por todas las páginas"""
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 200), False)
+    pix.clear_with(180)
+    image = pix.tobytes("png")
+
+    doc = fitz.open()
+    xref = 0
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Página de prueba {i + 1}", fontsize=14)
+        page.insert_text((72, 100), "Lorem ipsum dolor sit amet " * 3, fontsize=10)
+        xref = page.insert_image(fitz.Rect(72, 150, 272, 350), stream=image, xref=xref)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def timed(func, *args):
+    """Ejecuta func sin mostrar sus mensajes y devuelve los segundos que tardó"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+    elapsed = time.perf_counter() - start
+    if result is False:
+        raise RuntimeError(f"{func.__name__} falló")
+    return elapsed
+
+
+def bench_split(pdf_path, work_dir):
+    """Mide split_by_page y split_by_chunks con cada backend"""
+    results = {}
+
+    for backend in SPLIT_BACKENDS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            splitter = PDFSplitter(pdf_path, backend=backend)
+
+        page_dir = os.path.join(work_dir, f"paginas_{backend}")
+        chunk_dir = os.path.join(work_dir, f"fragmentos_{backend}")
+        results[backend] = {
+            'split_by_page': timed(splitter.split_by_page, page_dir),
+            'split_by_chunks(50)': timed(splitter.split_by_chunks, 50, chunk_dir),
+        }
+        shutil.rmtree(page_dir)
+        shutil.rmtree(chunk_dir)
+
+    return results
+
+
+def bench_merge(pdf_paths, work_dir):
+    """Mide merge_pdfs y merge_specific_pages (primera mitad de cada PDF) con cada backend"""
+    half = []
+    for path in pdf_paths:
+        with fitz.open(path) as doc:
+            half.append((path, 0, max(1, len(doc) // 2)))
+
+    results = {}
+    for backend in MERGE_BACKENDS:
+        merger = PDFMerger(backend=backend)
+        output = os.path.join(work_dir, f"fusion_{backend}.pdf")
+        results[backend] = {
+            'merge_pdfs': timed(merger.merge_pdfs, pdf_paths, output),
+            'merge_specific_pages': timed(merger.merge_specific_pages, half, output),
+        }
+        os.remove(output)
+
+    return results
+
+
+def make_merge_inputs(work_dir, name, count, pages):
+    """Crea `count` PDFs de `pages` páginas; los de igual tamaño son copias del primero"""
+    folder = os.path.join(work_dir, name.replace(" ", "_"))
+    os.makedirs(folder)
+    first = os.path.join(folder, "entrada_0.pdf")
+    make_sample_pdf(first, pages)
+    paths = [first]
+    for i in range(1, count):
+        paths.append(os.path.join(folder, f"entrada_{i}.pdf"))
+        shutil.copyfile(first, paths[-1])
+    return folder, paths
+
+
+def print_results(title, results):
+    """Muestra una tabla con los tiempos de cada backend y la mejora de mupdf"""
+    backends = list(results)
+    print(f"\n📊 {title}")
+    print(f"   {'operación':24}" + "".join(f"{b:>10}" for b in backends) + f"{'mejora':>10}")
+
+    for operation in results[backends[0]]:
+        times = [results[b][operation] for b in backends]
+        speedup = times[0] / times[-1] if times[-1] else float('inf')
+        print(f"   {operation:24}" + "".join(f"{t:>9.2f}s" for t in times) + f"{speedup:>9.1f}x")
+
+
+def main(pdf_paths):
+    print("=" * 60)
+    print("⏱️  BENCHMARK DE PDF TOOLKIT")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if not pdf_paths:
+            sample = os.path.join(work_dir, "muestra.pdf")
+            print("🛠️  Creando documento de prueba (2000 páginas)...")
+            make_sample_pdf(sample)
+            pdf_paths = [sample]
+
+        for pdf_path in pdf_paths:
+            size = os.path.getsize(pdf_path) / 1024 / 1024
+            print_results(f"Dividir {os.path.basename(pdf_path)} ({size:.1f} MB)",
+                          bench_split(pdf_path, work_dir))
+
+        for name, count, pages in MERGE_WORKLOADS:
+            print(f"\n🛠️  Creando {count} PDFs de {pages} páginas...")
+            folder, inputs = make_merge_inputs(work_dir, name, count, pages)
+            print_results(f"Fusionar {name} ({count} x {pages} páginas)",
+                          bench_merge(inputs, work_dir))
+            shutil.rmtree(folder)
+
+    print()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
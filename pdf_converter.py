@@ -3,180 +3,721 @@ Módulo para convertir PDFs a diferentes formatos y viceversa
 Requiere: pip install pdf2image Pillow PyMuPDF reportlab
 En Windows también necesitas: poppler (descarga y añade al PATH)
 """
-from pdf2image import convert_from_path
+from pdf2image import convert_from_bytes, convert_from_path
 from PIL import Image
 import fitz  # PyMuPDF
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+import io
 import os
+import tempfile
+import zlib
+
+from pdf_io import (PDF_BYTES_TYPES, PdfStreamWriter, describe, is_path, open_fitz, read_bytes,
+                    save_fitz, save_in_place)
+from pdf_parallel import ordered_map, resolve_workers, split_range
+
+
+RENDER_BACKENDS = ('poppler', 'mupdf')
+
+# Formatos que MuPDF sabe escribir directamente desde un pixmap
+_MUPDF_OUTPUTS = {'PNG': 'png', 'JPEG': 'jpeg', 'JPG': 'jpeg'}
+
+# Formatos que pdftoppm escribe directamente (misma calidad JPEG por defecto que Pillow)
+_POPPLER_OUTPUTS = {'PNG': 'png', 'JPEG': 'jpeg', 'JPG': 'jpeg'}
+
+# Páginas que renderiza como mínimo cada proceso pdftoppm: cada uno vuelve
+# a analizar el PDF, así que lanzar uno por página es muy lento
+_POPPLER_PAGES_PER_CALL = 32
+
+
+# PDF en memoria de cada proceso del pool (se envía una sola vez por proceso)
+_WORKER_SOURCE = None
+
+
+def _set_worker_source(data):
+    global _WORKER_SOURCE
+    _WORKER_SOURCE = data
+
+
+def _page_image_path(output_folder, page_no, options):
+    """
+    Ruta de salida de una página, lista para escribirla
+    
+    La salida puede ser un enlace duro a una entrada de RenderCache: se
+    elimina antes para no escribir a través del enlace y corromper la caché.
+    """
+    output_path = f"{output_folder}/pagina_{page_no}.{options['image_format'].lower()}"
+    if os.path.lexists(output_path):
+        os.remove(output_path)
+    return output_path
+
+
+def _save_pil_image(image, output_folder, page_no, options):
+    """Guarda una página en la carpeta o, sin carpeta, devuelve la imagen codificada"""
+    if output_folder is None:
+        buffer = io.BytesIO()
+        image.save(buffer, options['image_format'])
+        return buffer.getvalue()
+    
+    output_path = _page_image_path(output_folder, page_no, options)
+    image.save(output_path, options['image_format'])
+    return output_path
+
+
+def _iter_rendered_pages(source, first, last, output_folder, options):
+    """Renderiza y guarda las páginas first..last (base 1) con el backend elegido"""
+    if options['backend'] == 'mupdf':
+        yield from _iter_mupdf_pages(source, first, last, output_folder, options)
+    else:
+        yield from _iter_poppler_pages(source, first, last, output_folder, options)
+
+
+def _iter_poppler_pages(source, first, last, output_folder, options):
+    """
+    Renderiza páginas con pdftoppm, que las escribe directamente en disco
+    
+    Cada proceso renderiza un tramo de al menos _POPPLER_PAGES_PER_CALL
+    páginas en una carpeta temporal (dentro de la de salida, para mover los
+    archivos sin copiarlos). Las imágenes se entregan de una en una, así que
+    la memoria no depende del tamaño del tramo.
+    """
+    convert = convert_from_path if is_path(source) else convert_from_bytes
+    native = _POPPLER_OUTPUTS.get(options['image_format'].upper())
+    pages_per_call = max(options['batch_size'], _POPPLER_PAGES_PER_CALL)
+    
+    for start in range(first, last + 1, pages_per_call):
+        end = min(start + pages_per_call - 1, last)
+        with tempfile.TemporaryDirectory(dir=output_folder) as work_dir:
+            paths = convert(source, dpi=options['dpi'], first_page=start, last_page=end,
+                            grayscale=options['colorspace'] == 'GRAY',
+                            output_folder=work_dir, fmt=native or 'png',
+                            output_file='pagina', paths_only=True)
+            
+            for i, path in enumerate(paths, start=start):
+                if native is None:
+                    # BMP, TIFF...: Pillow convierte desde el PNG de pdftoppm
+                    with Image.open(path) as image:
+                        yield _save_pil_image(image, output_folder, i, options)
+                elif output_folder is None:
+                    with open(path, 'rb') as f:
+                        yield f.read()
+                else:
+                    output_path = _page_image_path(output_folder, i, options)
+                    os.replace(path, output_path)
+                    yield output_path
+
+
+def _iter_mupdf_pages(source, first, last, output_folder, options):
+    """Renderiza páginas en el propio proceso con PyMuPDF, sin pasar por pdftoppm"""
+    output = _MUPDF_OUTPUTS.get(options['image_format'].upper())
+    gray = options['colorspace'] == 'GRAY'
+    
+    with open_fitz(source) as doc:
+        for i in range(first, last + 1):
+            pix = doc[i - 1].get_pixmap(dpi=options['dpi'],
+                                        colorspace=fitz.csGRAY if gray else fitz.csRGB)
+            
+            if output and output_folder is None:
+                yield pix.tobytes(output=output, jpg_quality=75)
+            elif output:
+                # Misma calidad JPEG por defecto que Pillow
+                output_path = _page_image_path(output_folder, i, options)
+                pix.save(output_path, output=output, jpg_quality=75)
+                yield output_path
+            else:
+                # BMP, TIFF...: Pillow codifica directamente desde las muestras
+                image = Image.frombytes("L" if gray else "RGB", (pix.width, pix.height),
+                                        pix.samples)
+                result = _save_pil_image(image, output_folder, i, options)
+                image.close()
+                yield result
+
+
+def _render_pages(source, first, last, output_folder, options):
+    """Tarea de un proceso del pool: renderiza un tramo de páginas"""
+    if source is None:
+        source = _WORKER_SOURCE
+    return list(_iter_rendered_pages(source, first, last, output_folder, options))
+
+
+def _pdf_string(text):
+    """Literal de cadena PDF en WinAnsi (los caracteres sin equivalente se sustituyen por ?)"""
+    data = text.encode('cp1252', errors='replace')
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _write_text_page(writer, segments, font_id, font_size, pagesize, margin, line_height):
+    """Escribe en un PdfStreamWriter una página con una línea de texto por segmento"""
+    width, height = pagesize
+    content = [b"BT /F1 %g Tf %g TL %g %g Td" % (font_size, line_height, margin, height - margin)]
+    for i, segment in enumerate(segments):
+        content.append(_pdf_string(segment) + (b" Tj" if i == 0 else b" '"))
+    content.append(b"ET")
+    
+    content_id, page_id = writer.reserve(), writer.reserve()
+    writer.write_stream(content_id, b"/Filter/FlateDecode", zlib.compress(b"\n".join(content)))
+    writer.write_object(page_id, b"<</Type/Page/Parent %d 0 R/MediaBox[0 0 %g %g]"
+                        b"/Resources<</Font<</F1 %d 0 R>>>>/Contents %d 0 R>>"
+                        % (writer.PAGES_ID, width, height, font_id, content_id))
+    writer.add_page(page_id)
+
+
+# Espacios de color de los JPEG que se incrustan sin recodificar
+_JPEG_COLORSPACES = {'L': b'/DeviceGray', 'RGB': b'/DeviceRGB', 'CMYK': b'/DeviceCMYK'}
+
+
+def _write_image_page(writer, img_source):
+    """
+    Escribe en un PdfStreamWriter una página con una imagen a página completa
+    
+    Args:
+        writer (PdfStreamWriter): PDF de salida
+        img_source (str | bytes | archivo): Imagen de entrada
+    """
+    img_data = None if is_path(img_source) else read_bytes(img_source)
+    
+    # Image.open solo lee la cabecera: tamaño y formato sin decodificar
+    with Image.open(img_source if img_data is None else io.BytesIO(img_data)) as img:
+        width, height = img.size
+        
+        if img.format == 'JPEG' and img.mode in _JPEG_COLORSPACES:
+            if img_data is None:
+                with open(img_source, 'rb') as f:
+                    img_data = f.read()
+            entries = b"/ColorSpace%s/BitsPerComponent 8/Filter/DCTDecode" % (
+                _JPEG_COLORSPACES[img.mode])
+            if img.mode == 'CMYK' and 'adobe' in img.info:
+                # Photoshop y Pillow guardan el CMYK invertido (marcador Adobe)
+                entries += b"/Decode[1 0 1 0 1 0 1 0]"
+        else:
+            # Convertir a RGB si es necesario
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            img_data = zlib.compress(img.tobytes())
+            entries = b"/ColorSpace/DeviceRGB/BitsPerComponent 8/Filter/FlateDecode"
+    
+    # Mismo tamaño de página que Pillow con resolution=100
+    page_width, page_height = width * 72 / 100, height * 72 / 100
+    image_id, content_id, page_id = writer.reserve(), writer.reserve(), writer.reserve()
+    writer.write_stream(image_id, b"/Type/XObject/Subtype/Image/Width %d/Height %d%s"
+                        % (width, height, entries), img_data)
+    writer.write_stream(content_id, b"",
+                        b"q %.4f 0 0 %.4f 0 0 cm /Im0 Do Q" % (page_width, page_height))
+    writer.write_object(page_id, b"<</Type/Page/Parent %d 0 R/MediaBox[0 0 %.4f %.4f]"
+                        b"/Resources<</XObject<</Im0 %d 0 R>>>>/Contents %d 0 R>>"
+                        % (writer.PAGES_ID, page_width, page_height, image_id, content_id))
+    writer.add_page(page_id)
+
+
+# Tablas de anchos de glifo por fuente (a tamaño 1), rellenadas bajo demanda
+_GLYPH_WIDTHS = {}
+
+
+def _text_width(text, font_name, font_size):
+    """Ancho de un texto en puntos usando la tabla de anchos cacheada de la fuente"""
+    widths = _GLYPH_WIDTHS.setdefault(font_name, {})
+    total = 0.0
+    for char in text:
+        width = widths.get(char)
+        if width is None:
+            width = widths[char] = pdfmetrics.stringWidth(char, font_name, 1)
+        total += width
+    return total * font_size
+
+
+def _wrap_line(line, max_width, font_name, font_size):
+    """Parte una línea en trozos que caben en max_width, cortando por palabras"""
+    if _text_width(line, font_name, font_size) <= max_width:
+        yield line
+        return
+    
+    current = ''
+    for word in line.split(' '):
+        candidate = f"{current} {word}" if current else word
+        if _text_width(candidate, font_name, font_size) <= max_width:
+            current = candidate
+            continue
+        
+        if current:
+            yield current
+        
+        # Palabras más largas que la línea: cortar por caracteres
+        current = ''
+        for char in word:
+            if current and _text_width(current + char, font_name, font_size) > max_width:
+                yield current
+                current = ''
+            current += char
+    
+    yield current
+
+
+def _pool_source(source):
+    """
+    Argumentos para repartir un PDF entre procesos: las rutas viajan en cada
+    tarea y el contenido en memoria se envía una sola vez a cada proceso
+    
+    Returns:
+        tuple: (origen para las tareas, initializer, initargs)
+    """
+    if is_path(source):
+        return source, None, ()
+    return None, _set_worker_source, (source,)
+
+
+def _extract_text_range(source, start, stop):
+    """Tarea de un proceso del pool: extrae el texto de las páginas [start, stop)"""
+    with open_fitz(_WORKER_SOURCE if source is None else source) as doc:
+        return [(page_num + 1, doc[page_num].get_text()) for page_num in range(start, stop)]
+
 
 class PDFConverter:
-    def __init__(self):
+    def __init__(self, render_cache=None):
+        """
+        Inicializa el convertidor
+        
+        Args:
+            render_cache (RenderCache): Caché de páginas renderizadas (opcional)
+        """
         self.supported_image_formats = ['PNG', 'JPEG', 'JPG', 'BMP', 'TIFF']
+        self.render_cache = render_cache
     
-    def pdf_to_images(self, pdf_path, output_folder="pdf_images", image_format='PNG', dpi=200):
+    def pdf_to_images(self, pdf_path, output_folder="pdf_images", image_format='PNG', dpi=200,
+                      batch_size=1, workers=1, backend='poppler', colorspace='RGB'):
         """
         Convierte un PDF a imágenes (una por página)
         
         Args:
-            pdf_path (str): Ruta del PDF
-            output_folder (str): Carpeta de salida
+            pdf_path (str | bytes | archivo): PDF de entrada (ruta, bytes o archivo abierto)
+            output_folder (str): Carpeta de salida (None = devolver las imágenes como bytes)
             image_format (str): Formato de imagen (PNG, JPEG, etc.)
             dpi (int): Resolución de la imagen (mayor = mejor calidad)
+            batch_size (int): Páginas por lote (con poppler, al menos 32 por proceso)
+            workers (int): Procesos en paralelo (None = todos los núcleos)
+            backend (str): 'poppler' (pdf2image) o 'mupdf' (PyMuPDF, sin subprocesos)
+            colorspace (str): 'RGB' o 'GRAY'
+            
+        Returns:
+            list: Imágenes codificadas si output_folder es None; True en otro caso
         """
         try:
-            os.makedirs(output_folder, exist_ok=True)
-            
             print(f"🔄 Convirtiendo PDF a imágenes (DPI: {dpi})...")
             
-            # Convertir PDF a lista de imágenes
-            images = convert_from_path(pdf_path, dpi=dpi)
-            
-            for i, image in enumerate(images, start=1):
-                output_path = f"{output_folder}/pagina_{i}.{image_format.lower()}"
-                image.save(output_path, image_format)
+            images = []
+            total = 0
+            for i, result in enumerate(
+                    self.iter_images(pdf_path, output_folder, image_format, dpi,
+                                     batch_size, workers, backend, colorspace),
+                    start=1):
+                if output_folder is None:
+                    images.append(result)
                 print(f"✅ Página {i} convertida a {image_format}")
+                total = i
             
-            print(f"🎉 {len(images)} páginas convertidas en: {output_folder}")
-            return True
+            print(f"🎉 {total} páginas convertidas en: {describe(output_folder)}")
+            if self.render_cache:
+                stats = self.render_cache.stats()
+                print(f"🗃️  Caché: {stats['hits']} aciertos, {stats['misses']} fallos")
+            return images if output_folder is None else True
             
         except Exception as e:
             print(f"❌ Error al convertir a imágenes: {str(e)}")
-            print("💡 Asegúrate de tener poppler instalado (Windows)")
+            if backend == 'poppler':
+                print("💡 Asegúrate de tener poppler instalado (Windows)")
             return False
     
+    def iter_images(self, pdf_path, output_folder="pdf_images", image_format='PNG', dpi=200,
+                    batch_size=1, workers=1, backend='poppler', colorspace='RGB'):
+        """
+        Convierte un PDF a imágenes en modo streaming
+        
+        Renderiza, guarda y libera cada lote de páginas antes de pasar al
+        siguiente, por lo que la memoria queda acotada sin importar la
+        longitud del documento. Con poppler, cada proceso pdftoppm renderiza
+        al menos 32 páginas y las escribe en disco, en vez de volver a
+        analizar el PDF para cada página. Con `workers` > 1
+        el documento se reparte en tramos contiguos entre varios procesos,
+        cada uno con su propio manejador del PDF; las rutas se siguen
+        devolviendo en orden de página.
+        
+        El backend 'mupdf' renderiza cada página en el propio proceso y la
+        escribe directamente en el formato pedido, evitando lanzar pdftoppm
+        y el paso intermedio por archivos PPM del backend 'poppler'.
+        
+        Si el convertidor tiene una RenderCache, las páginas ya renderizadas
+        con los mismos parámetros se copian o enlazan desde la caché y solo
+        se renderizan las que faltan. La caché solo se usa al escribir en
+        una carpeta.
+        
+        Args:
+            pdf_path (str | bytes | archivo): PDF de entrada (ruta, bytes o archivo abierto)
+            output_folder (str): Carpeta de salida (None = devolver las imágenes como bytes)
+            image_format (str): Formato de imagen (PNG, JPEG, etc.)
+            dpi (int): Resolución de la imagen
+            batch_size (int): Páginas por lote (con poppler, al menos 32 por proceso)
+            workers (int): Procesos en paralelo (None = todos los núcleos)
+            backend (str): 'poppler' (pdf2image) o 'mupdf' (PyMuPDF)
+            colorspace (str): 'RGB' o 'GRAY'
+            
+        Yields:
+            str | bytes: Ruta de cada imagen en cuanto se escribe, o la imagen
+            codificada si output_folder es None
+        """
+        if backend not in RENDER_BACKENDS:
+            raise ValueError(f"Backend de renderizado no soportado: {backend}")
+        if colorspace not in ('RGB', 'GRAY'):
+            raise ValueError(f"Espacio de color no soportado: {colorspace}")
+        
+        if output_folder is not None:
+            os.makedirs(output_folder, exist_ok=True)
+        
+        # Los archivos abiertos se leen una sola vez: cada lote vuelve a abrir el PDF
+        source = pdf_path if is_path(pdf_path) else read_bytes(pdf_path)
+        with open_fitz(source) as doc:
+            page_count = len(doc)
+        
+        options = {
+            'image_format': image_format,
+            'dpi': dpi,
+            'batch_size': max(1, batch_size),
+            'backend': backend,
+            'colorspace': colorspace,
+        }
+        workers = resolve_workers(workers)
+        
+        # pdf2image vuelca los bytes a un archivo temporal en cada llamada a
+        # pdftoppm: se escriben en disco una sola vez para toda la conversión
+        spill_path = None
+        if backend == 'poppler' and not is_path(source):
+            fd, spill_path = tempfile.mkstemp(suffix='.pdf')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(source)
+        
+        try:
+            yield from self._iter_pages(source, spill_path or source, page_count,
+                                        output_folder, options, workers)
+        finally:
+            if spill_path:
+                os.remove(spill_path)
+    
+    def _iter_pages(self, source, render_source, page_count, output_folder, options, workers):
+        """Entrega las páginas desde la caché o renderizándolas desde render_source"""
+        if not self.render_cache or output_folder is None:
+            yield from self._render_span(render_source, 1, page_count, output_folder, options,
+                                         workers)
+            return
+        
+        cache = self.render_cache
+        doc_hash = cache.document_hash(source)
+        pending = []  # Tramo actual de páginas que no están en caché
+        
+        for page_no in range(1, page_count + 1):
+            key = cache.make_key(doc_hash, page_no - 1, options['dpi'], options['image_format'],
+                                 options['colorspace'], options['backend'])
+            output_path = _page_image_path(output_folder, page_no, options)
+            
+            if cache.fetch(key, output_path):
+                yield from self._render_missing(render_source, pending, output_folder, options,
+                                                workers, doc_hash)
+                pending = []
+                yield output_path
+            else:
+                pending.append(page_no)
+        
+        yield from self._render_missing(render_source, pending, output_folder, options, workers,
+                                        doc_hash)
+    
+    def _render_span(self, source, first, last, output_folder, options, workers):
+        """Renderiza las páginas first..last, en serie o repartidas entre procesos"""
+        # Con poppler, cada tramo es un proceso pdftoppm que vuelve a analizar el PDF
+        min_size = options['batch_size']
+        if options['backend'] == 'poppler':
+            min_size = max(min_size, _POPPLER_PAGES_PER_CALL)
+        
+        if workers == 1 or last - first + 1 <= min_size:
+            yield from _iter_rendered_pages(source, first, last, output_folder, options)
+            return
+        
+        # Varios tramos por proceso para repartir bien la carga
+        ranges = split_range(first, last + 1, workers * 4, min_size=min_size)
+        task_source, initializer, initargs = _pool_source(source)
+        tasks = ((task_source, start, stop - 1, output_folder, options) for start, stop in ranges)
+        
+        for results in ordered_map(_render_pages, tasks, min(workers, len(ranges)),
+                                   initializer, initargs):
+            yield from results
+    
+    def _render_missing(self, source, pages, output_folder, options, workers, doc_hash):
+        """Renderiza un tramo contiguo de páginas ausentes y las guarda en la caché"""
+        if not pages:
+            return
+        
+        cache = self.render_cache
+        for page_no, output_path in zip(pages, self._render_span(
+                source, pages[0], pages[-1], output_folder, options, workers)):
+            key = cache.make_key(doc_hash, page_no - 1, options['dpi'], options['image_format'],
+                                 options['colorspace'], options['backend'])
+            cache.store(key, output_path)
+            yield output_path
+    
     def images_to_pdf(self, image_paths, output_path="imagenes_a_pdf.pdf"):
         """
         Convierte múltiples imágenes a un PDF
         
+        Las imágenes JPEG se incrustan tal cual (flujo DCT) sin decodificarlas
+        ni volver a comprimirlas. El resto se carga de una en una y se libera
+        antes de pasar a la siguiente. Cada página y su imagen se escriben en
+        la salida en cuanto se leen, así que la memoria no crece con el
+        número de imágenes.
+        
         Args:
-            image_paths (list): Lista de rutas de imágenes
-            output_path (str): Ruta del PDF de salida
+            image_paths (list): Imágenes como rutas, bytes o archivos abiertos
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
         """
+        output = writer = None
         try:
-            images = []
-            
-            # Cargar y validar imágenes
-            for img_path in image_paths:
-                if not os.path.exists(img_path):
-                    print(f"⚠️  Imagen no encontrada: {img_path}")
+            for img_source in image_paths:
+                if is_path(img_source) and not os.path.exists(img_source):
+                    print(f"⚠️  Imagen no encontrada: {img_source}")
                     continue
                 
-                img = Image.open(img_path)
-                # Convertir a RGB si es necesario (para JPEG)
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                images.append(img)
-                print(f"📷 Imagen cargada: {img_path}")
-            
-            if not images:
+                if writer is None:
+                    # La salida se crea con la primera imagen válida
+                    if is_path(output_path):
+                        output = open(output_path, 'wb')
+                    else:
+                        output = io.BytesIO() if output_path is None else output_path
+                    writer = PdfStreamWriter(output)
+                
+                _write_image_page(writer, img_source)
+                print(f"📷 Imagen cargada: {describe(img_source)}")
+            
+            if writer is None:
                 print("❌ No hay imágenes válidas para convertir")
                 return False
             
-            # Guardar todas las imágenes como PDF
-            images[0].save(
-                output_path, 
-                save_all=True, 
-                append_images=images[1:],
-                resolution=100.0
-            )
+            writer.close()
+            page_count = len(writer.kids)
+            if is_path(output_path):
+                output.close()
             
-            print(f"✅ PDF creado: {output_path} ({len(images)} páginas)")
-            return True
+            print(f"✅ PDF creado: {describe(output_path)} ({page_count} páginas)")
+            return output.getvalue() if output_path is None else True
             
         except Exception as e:
+            if is_path(output_path) and output is not None:
+                output.close()
             print(f"❌ Error al convertir imágenes a PDF: {str(e)}")
             return False
     
-    def pdf_to_text(self, pdf_path, output_path="output.txt"):
+    def pdf_to_text(self, pdf_path, output_path="output.txt", workers=1):
         """
         Extrae todo el texto de un PDF
         
+        Cada página se escribe en la salida en cuanto se extrae, así que
+        la memoria no crece con el tamaño del documento.
+        
         Args:
-            pdf_path (str): Ruta del PDF
-            output_path (str): Ruta del archivo de texto de salida
+            pdf_path (str | bytes | archivo): PDF de entrada (ruta, bytes o archivo abierto)
+            output_path (str | archivo): Archivo de texto de salida, buffer de texto
+                o None para devolver el texto como str
+            workers (int): Procesos en paralelo (None = todos los núcleos)
         """
         try:
-            doc = fitz.open(pdf_path)
-            full_text = []
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text = page.get_text()
-                full_text.append(f"--- Página {page_num + 1} ---\n{text}\n")
-                print(f"📄 Página {page_num + 1} procesada")
+            if is_path(output_path):
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    self._write_text(pdf_path, f, workers)
+                result = True
+            elif output_path is None:
+                buffer = io.StringIO()
+                self._write_text(pdf_path, buffer, workers)
+                result = buffer.getvalue()
+            else:
+                self._write_text(pdf_path, output_path, workers)
+                result = True
             
-            # Guardar en archivo
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(full_text))
-            
-            doc.close()
-            print(f"✅ Texto extraído y guardado en: {output_path}")
-            return True
+            print(f"✅ Texto extraído y guardado en: {describe(output_path)}")
+            return result
             
         except Exception as e:
             print(f"❌ Error al extraer texto: {str(e)}")
             return False
     
+    def _write_text(self, pdf_path, f, workers):
+        """Escribe el texto de cada página, con su cabecera, en un archivo de texto abierto"""
+        for page_no, text in self.iter_text(pdf_path, workers):
+            if page_no > 1:
+                f.write('\n')
+            f.write(f"--- Página {page_no} ---\n{text}\n")
+            print(f"📄 Página {page_no} procesada")
+    
+    def iter_text(self, pdf_path, workers=1):
+        """
+        Extrae el texto de un PDF página a página
+        
+        Con `workers` > 1 los tramos de páginas se reparten entre varios
+        procesos, cada uno con su propio documento abierto, y los
+        resultados se devuelven en orden de página.
+        
+        Args:
+            pdf_path (str | bytes | archivo): PDF de entrada (ruta, bytes o archivo abierto)
+            workers (int): Procesos en paralelo (None = todos los núcleos)
+            
+        Yields:
+            tuple: (número de página empezando en 1, texto de la página)
+        """
+        workers = resolve_workers(workers)
+        source = pdf_path if is_path(pdf_path) else read_bytes(pdf_path)
+        
+        with open_fitz(source) as doc:
+            if workers == 1:
+                for page_num in range(len(doc)):
+                    yield page_num + 1, doc[page_num].get_text()
+                return
+            page_count = len(doc)
+        
+        ranges = split_range(0, page_count, workers * 4)
+        task_source, initializer, initargs = _pool_source(source)
+        tasks = ((task_source, start, stop) for start, stop in ranges)
+        
+        for pages in ordered_map(_extract_text_range, tasks, min(workers, len(ranges) or 1),
+                                 initializer, initargs):
+            yield from pages
+    
     def text_to_pdf(self, text_content, output_path="text_to_pdf.pdf"):
         """
         Crea un PDF desde texto
         
         Args:
             text_content (str): Contenido de texto
-            output_path (str): Ruta del PDF de salida
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
+        """
+        try:
+            page_count, result = self._write_text_pdf(text_content.split('\n'), output_path)
+            print(f"✅ PDF de texto creado: {describe(output_path)} ({page_count} páginas)")
+            return result
+            
+        except Exception as e:
+            print(f"❌ Error al crear PDF desde texto: {str(e)}")
+            return False
+    
+    def text_file_to_pdf(self, source, output_path="text_to_pdf.pdf", encoding='utf-8'):
+        """
+        Crea un PDF desde un archivo de texto o cualquier iterador de líneas
+        
+        Las líneas se leen y se dibujan de una en una, sin cargar el texto
+        completo en memoria, así que sirve para archivos de log enormes.
+        
+        Args:
+            source (str | bytes | iterable): Ruta del archivo de texto, su contenido
+                en bytes o un iterador de líneas (p. ej. un archivo abierto)
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
+            encoding (str): Codificación del archivo de texto
+        """
+        try:
+            if is_path(source):
+                with open(source, 'r', encoding=encoding) as f:
+                    page_count, result = self._write_text_pdf(f, output_path)
+            elif isinstance(source, PDF_BYTES_TYPES):
+                lines = io.TextIOWrapper(io.BytesIO(source), encoding=encoding)
+                page_count, result = self._write_text_pdf(lines, output_path)
+            else:
+                page_count, result = self._write_text_pdf(source, output_path)
+            
+            print(f"✅ PDF de texto creado: {describe(output_path)} ({page_count} páginas)")
+            return result
+            
+        except Exception as e:
+            print(f"❌ Error al crear PDF desde texto: {str(e)}")
+            return False
+    
+    def _write_text_pdf(self, lines, output_path, font_name="Helvetica", font_size=12):
+        """
+        Dibuja las líneas en páginas carta, partiendo las que no caben en el ancho
+        
+        Cada página se escribe comprimida en la salida en cuanto se llena,
+        así que la memoria no depende de la longitud del texto.
+        
+        Returns:
+            tuple: (número de páginas generadas, bytes del PDF si output_path es None
+            o True en otro caso)
         """
+        if is_path(output_path):
+            output = open(output_path, 'wb')
+        else:
+            output = io.BytesIO() if output_path is None else output_path
+        
         try:
-            c = canvas.Canvas(output_path, pagesize=letter)
+            writer = PdfStreamWriter(output)
             width, height = letter
             
             # Configuración de texto
-            c.setFont("Helvetica", 12)
-            y_position = height - 50  # Margen superior
+            margin = 50
             line_height = 15
+            max_width = width - 2 * margin
+            lines_per_page = int((height - 2 * margin) // line_height) + 1
             
-            lines = text_content.split('\n')
+            # Fuente estándar (no se incrusta): un único objeto para todas las páginas
+            font_id = writer.reserve()
+            writer.write_object(font_id, b"<</Type/Font/Subtype/Type1/BaseFont/%s"
+                                b"/Encoding/WinAnsiEncoding>>" % font_name.encode())
             
+            page = []
             for line in lines:
-                # Nueva página si no hay espacio
-                if y_position < 50:
-                    c.showPage()
-                    c.setFont("Helvetica", 12)
-                    y_position = height - 50
-                
-                c.drawString(50, y_position, line[:90])  # Limitar ancho
-                y_position -= line_height
+                for segment in _wrap_line(line.rstrip('\r\n'), max_width, font_name, font_size):
+                    # Nueva página si no hay espacio
+                    if len(page) == lines_per_page:
+                        _write_text_page(writer, page, font_id, font_size, letter, margin,
+                                         line_height)
+                        page = []
+                    page.append(segment)
+            _write_text_page(writer, page, font_id, font_size, letter, margin, line_height)
             
-            c.save()
-            print(f"✅ PDF de texto creado: {output_path}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error al crear PDF desde texto: {str(e)}")
-            return False
+            writer.close()
+        finally:
+            if is_path(output_path):
+                output.close()
+        
+        return len(writer.kids), output.getvalue() if output_path is None else True
     
-    def rotate_pdf(self, pdf_path, output_path, rotation=90):
+    def rotate_pdf(self, pdf_path, output_path, rotation=90, incremental=False):
         """
         Rota todas las páginas de un PDF
         
         Args:
-            pdf_path (str): PDF de entrada
-            output_path (str): PDF de salida
+            pdf_path (str | bytes | archivo): PDF de entrada (ruta, bytes o archivo abierto)
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
             rotation (int): Grados de rotación (90, 180, 270)
+            incremental (bool): Añadir solo las páginas modificadas al final del
+                PDF de entrada (output_path debe ser None o el mismo archivo); si el
+                PDF no lo admite, se guarda completo sobre él
         """
         try:
-            doc = fitz.open(pdf_path)
+            if incremental and not is_path(pdf_path):
+                raise ValueError("El guardado incremental necesita un PDF en disco")
+            if incremental and output_path is not None and (
+                    not is_path(output_path) or
+                    os.path.abspath(output_path) != os.path.abspath(pdf_path)):
+                raise ValueError("El guardado incremental solo puede escribir sobre el PDF original")
+            
+            doc = open_fitz(pdf_path)
             
             for page in doc:
                 page.set_rotation(rotation)
                 print(f"🔄 Página rotada {rotation}°")
             
-            doc.save(output_path)
+            if incremental:
+                save_in_place(doc, pdf_path)
+                output_path = pdf_path
+                result = True
+            else:
+                result = save_fitz(doc, output_path)
             doc.close()
             
-            print(f"✅ PDF rotado guardado en: {output_path}")
-            return True
+            print(f"✅ PDF rotado guardado en: {describe(output_path)}")
+            return result
             
         except Exception as e:
             print(f"❌ Error al rotar PDF: {str(e)}")
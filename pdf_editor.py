@@ -6,20 +6,454 @@ from pypdf import PdfReader, PdfWriter
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import hashlib
 import io
+import json
 import os
 
+from pdf_io import PDF_BYTES_TYPES, describe, is_path, read_bytes, save_fitz, save_in_place
+
+
+def make_text_watermark(text, opacity=0.3, fontsize=60, color=(0.7, 0.7, 0.7), angle=45):
+    """
+    Crea una marca de agua de texto como un PDF de una página
+    
+    Args:
+        text (str): Texto de la marca de agua
+        opacity (float): Opacidad (0-1)
+        fontsize (int): Tamaño de fuente
+        color (tuple): Color RGB (0-1)
+        angle (float): Ángulo del texto en grados
+    
+    Returns:
+        fitz.Document: Documento con la marca de agua (ver apply_watermark)
+    """
+    text_width = fitz.get_text_length(text, fontname="helv", fontsize=fontsize)
+    
+    # Página cuadrada que contiene el texto girado en cualquier ángulo
+    side = (text_width ** 2 + fontsize ** 2) ** 0.5 + fontsize
+    wm_doc = fitz.open()
+    page = wm_doc.new_page(width=side, height=side)
+    center = page.rect.tl + (side / 2, side / 2)
+    
+    # Helvetica estándar (base 14): solo una referencia a la fuente, sin incrustarla
+    page.insert_text(center + (-text_width / 2, fontsize / 3), text, fontname="helv",
+                     fontsize=fontsize, color=color, fill_opacity=opacity,
+                     morph=(center, fitz.Matrix(angle)))
+    return wm_doc
+
+
+def make_image_watermark(image_path, opacity=0.3, scale=1.0):
+    """
+    Crea una marca de agua a partir de una imagen como un PDF de una página
+    
+    Args:
+        image_path (str | bytes): Ruta de la imagen o su contenido
+        opacity (float): Opacidad (0-1)
+        scale (float): Escala respecto al tamaño de la imagen (1 px = 1 pt)
+    
+    Returns:
+        fitz.Document: Documento con la marca de agua (ver apply_watermark)
+    """
+    if isinstance(image_path, PDF_BYTES_TYPES):
+        image_path = io.BytesIO(image_path)
+    with Image.open(image_path) as img:
+        img = img.convert('RGBA')
+        alpha = img.getchannel('A').point(lambda a: int(a * opacity))
+        img.putalpha(alpha)
+        buffer = io.BytesIO()
+        img.save(buffer, 'PNG')
+        width, height = img.size
+    
+    wm_doc = fitz.open()
+    page = wm_doc.new_page(width=width * scale, height=height * scale)
+    page.insert_image(page.rect, stream=buffer.getvalue())
+    
+    # Comprimir la imagen una sola vez antes de copiarla al documento destino
+    return fitz.open("pdf", wm_doc.tobytes(deflate=True))
+
+
+def apply_watermark(doc, wm_doc):
+    """
+    Estampa la marca de agua en el centro de todas las páginas
+    
+    La marca se incrusta una sola vez como Form XObject. Para cada geometría
+    de página distinta se crea con show_pdf_page un envoltorio que la
+    posiciona; el resto de páginas con la misma geometría solo reciben una
+    referencia a ese envoltorio y a unos flujos de contenido compartidos,
+    así que el coste y el tamaño añadido apenas dependen del número de
+    páginas.
+    
+    Args:
+        doc (fitz.Document): Documento a marcar
+        wm_doc (fitz.Document): Marca de agua (make_text_watermark / make_image_watermark)
+    
+    Returns:
+        int: Número de páginas marcadas
+    """
+    wm_rect = wm_doc[0].rect
+    wrappers = {}  # geometría de página -> (xref del envoltorio, {nombre: xref del flujo})
+    q_xref = big_q_xref = None
+    
+    for page in doc:
+        page_xref = page.xref
+        geometry = (tuple(page.mediabox), tuple(page.cropbox), page.rotation)
+        
+        if geometry not in wrappers:
+            center = page.rect.tl + (page.rect.width / 2, page.rect.height / 2)
+            rect = fitz.Rect(center, center) + (-wm_rect.width / 2, -wm_rect.height / 2,
+                                                wm_rect.width / 2, wm_rect.height / 2)
+            before = {item[0] for item in page.get_xobjects()}
+            # Igual que en el resto de páginas: el contenido original va entre q/Q
+            if not page.is_wrapped:
+                page.wrap_contents()
+            page.show_pdf_page(rect, wm_doc, 0, overlay=True)
+            wrapper = next(item[0] for item in page.get_xobjects()
+                           if item[0] not in before and item[2] == 0)
+            wrappers[geometry] = (wrapper, {})
+            continue
+        
+        wrapper, stamps = wrappers[geometry]
+        if q_xref is None:
+            q_xref, big_q_xref = _new_stream(doc, b"q\n"), _new_stream(doc, b"\nQ\n")
+        
+        # Nombre derivado del envoltorio; un flujo de estampado compartido por cada nombre
+        name = _add_xobject(doc, page_xref, f"fzWm{wrapper}", wrapper)
+        if name not in stamps:
+            stamps[name] = _new_stream(doc, f" q /{name} Do Q ".encode())
+        stamp = stamps[name]
+        
+        kind, value = doc.xref_get_key(page_xref, "Contents")
+        if kind == 'xref':
+            contents = [value]
+        elif kind == 'array':
+            contents = [value.strip()[1:-1].strip()]
+        else:
+            contents = []
+        
+        # Encerrar el contenido original en q/Q para que no altere la marca
+        refs = [f"{q_xref} 0 R"] + contents + [f"{big_q_xref} 0 R", f"{stamp} 0 R"]
+        doc.xref_set_key(page_xref, "Contents", f"[{' '.join(refs)}]")
+    
+    return len(doc)
+
+
+def _new_stream(doc, data):
+    """Crea un nuevo objeto de flujo y devuelve su xref"""
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<<>>")
+    doc.update_stream(xref, data)
+    return xref
+
+
+def _add_xobject(doc, page_xref, name, xref):
+    """
+    Registra un XObject en los recursos de la página, siguiendo objetos indirectos
+    
+    No sustituye entradas existentes: si el nombre ya está ocupado por otro
+    objeto (p. ej. una marca de agua anterior) se le añade un sufijo.
+    
+    Returns:
+        str: Nombre con el que quedó registrado
+    """
+    _set_own_resources(doc, page_xref)
+    
+    target, path = page_xref, "Resources"
+    kind, value = doc.xref_get_key(target, path)
+    if kind == 'xref':
+        target, path = int(value.split()[0]), ""
+    
+    path = f"{path}/XObject" if path else "XObject"
+    kind, value = doc.xref_get_key(target, path)
+    if kind == 'xref':
+        target, path = int(value.split()[0]), ""
+    
+    base, suffix = name, 0
+    while True:
+        key = f"{path}/{name}" if path else name
+        kind, value = doc.xref_get_key(target, key)
+        if kind == 'null':
+            doc.xref_set_key(target, key, f"{xref} 0 R")
+            return name
+        if kind == 'xref' and int(value.split()[0]) == xref:
+            return name
+        suffix += 1
+        name = f"{base}_{suffix}"
+
+
+def _set_own_resources(doc, page_xref):
+    """Copia al diccionario de la página los /Resources heredados de sus padres"""
+    kind, value = doc.xref_get_key(page_xref, "Resources")
+    node = page_xref
+    while kind == 'null':
+        parent_kind, parent = doc.xref_get_key(node, "Parent")
+        if parent_kind != 'xref':
+            return
+        node = int(parent.split()[0])
+        kind, value = doc.xref_get_key(node, "Resources")
+    
+    if node != page_xref:
+        doc.xref_set_key(page_xref, "Resources", value)
+
+
+def _page_set(spec, page_count):
+    """Convierte enteros y rangos de páginas (base 0) en un conjunto de índices válidos"""
+    pages = set()
+    if spec is None:
+        return pages
+    if isinstance(spec, (int, range)):
+        spec = [spec]
+    
+    for item in spec:
+        if isinstance(item, range):
+            pages.update(page_num for page_num in item if 0 <= page_num < page_count)
+        elif 0 <= item < page_count:
+            pages.add(item)
+    return pages
+
+
+# Atributos que una página puede heredar de sus nodos /Pages
+_INHERITABLE_KEYS = ("Resources", "MediaBox", "CropBox", "Rotate")
+
+# Métodos privados de fitz.Document que usa _rebuild_page_tree (los mismos que delete_pages)
+_PRIVATE_PAGE_TREE_API = ("_remove_toc_item", "_remove_links_to", "_reset_page_refs")
+
+
+def _rebuild_page_tree(doc, pages):
+    """
+    Deja en el documento solo las páginas indicadas con un recorrido lineal
+    
+    Document.select() y delete_page() de PyMuPDF recorren el árbol de páginas
+    por cada página, lo que resulta cuadrático en documentos grandes. Aquí
+    se sustituye el árbol por un único nodo /Pages con las páginas
+    conservadas, copiando antes a cada página los atributos que heredaba
+    de los nodos intermedios.
+    
+    Usa métodos privados de PyMuPDF (probados con la versión fijada,
+    1.23.8); si no existen se recurre a Document.select().
+    
+    Args:
+        doc (fitz.Document): Documento a modificar
+        pages (list): Páginas a conservar (base 0), en orden
+    """
+    if not all(hasattr(doc, name) for name in _PRIVATE_PAGE_TREE_API):
+        doc.select(pages)
+        return
+    
+    kept = set(pages)
+    dropped = frozenset(page_num for page_num in range(len(doc)) if page_num not in kept)
+    
+    # Igual que delete_page(): quitar marcadores y enlaces a páginas eliminadas
+    toc = doc.get_toc(simple=True)
+    for item, xref in zip(toc, doc.get_outline_xrefs()):
+        if item[2] - 1 in dropped:
+            doc._remove_toc_item(xref)
+    doc._remove_links_to(dropped)
+    
+    root = int(doc.xref_get_key(doc.pdf_catalog(), "Pages")[1].split()[0])
+    inherited = {}  # xref de nodo /Pages -> atributos heredables efectivos
+    
+    def node_attributes(node):
+        if node not in inherited:
+            attributes = {}
+            kind, parent = doc.xref_get_key(node, "Parent")
+            if kind == 'xref':
+                attributes.update(node_attributes(int(parent.split()[0])))
+            for key in _INHERITABLE_KEYS:
+                kind, value = doc.xref_get_key(node, key)
+                if kind != 'null':
+                    attributes[key] = value
+            inherited[node] = attributes
+        return inherited[node]
+    
+    page_xrefs = [doc.page_xref(page_num) for page_num in pages]
+    for xref in page_xrefs:
+        kind, parent = doc.xref_get_key(xref, "Parent")
+        if kind == 'xref':
+            for key, value in node_attributes(int(parent.split()[0])).items():
+                if doc.xref_get_key(xref, key)[0] == 'null':
+                    doc.xref_set_key(xref, key, value)
+        doc.xref_set_key(xref, "Parent", f"{root} 0 R")
+    
+    doc.xref_set_key(root, "Kids", "[" + " ".join(f"{xref} 0 R" for xref in page_xrefs) + "]")
+    doc.xref_set_key(root, "Count", str(len(page_xrefs)))
+    
+    # Igual que delete_pages(): los objetos Page abiertos ya no son válidos
+    doc._reset_page_refs()
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+# quality -> (DPI máximo de las imágenes, calidad JPEG)
+COMPRESS_QUALITY_TIERS = {
+    0: (72, 50),  # Alta compresión
+    1: (150, 70),  # Equilibrado
+    2: (220, 85),  # Mejor calidad
+}
+
+
+def recompress_images(doc, quality=1, workers=None):
+    """
+    Reduce y recomprime en JPEG las imágenes del documento
+    
+    Las imágenes que se muestran por encima del DPI del nivel de calidad se
+    reducen a ese DPI, y todas se codifican en JPEG con la calidad del
+    nivel. Una imagen dibujada en varios sitios se reduce según su colocación
+    más grande (la de menor DPI), así que ninguna baja del DPI del nivel.
+    Solo se sustituye una imagen si el resultado ocupa menos que el
+    flujo original. La decodificación y las llamadas a PyMuPDF se hacen en
+    el hilo principal; el redimensionado y la codificación, que son la
+    parte lenta, en un pool de hilos.
+    
+    Args:
+        doc (fitz.Document): Documento a modificar
+        quality (int): 0=baja, 1=media, 2=alta calidad
+        workers (int): Hilos del pool (None = según núcleos)
+    
+    Returns:
+        tuple: (imágenes recomprimidas, bytes ahorrados)
+    """
+    target_dpi, jpeg_quality = COMPRESS_QUALITY_TIERS[quality]
+    
+    # DPI efectivo mínimo con el que se dibuja cada imagen: el de su colocación más
+    # grande, que es la que no debe quedar por debajo del DPI del nivel
+    image_dpi = {}
+    for page in doc:
+        for info in page.get_image_info(xrefs=True):
+            bbox = fitz.Rect(info['bbox'])
+            if not info['xref'] or bbox.is_empty:
+                continue
+            dpi = max(info['width'] * 72 / bbox.width, info['height'] * 72 / bbox.height)
+            image_dpi[info['xref']] = min(dpi, image_dpi.get(info['xref'], float('inf')))
+    
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    savings = []  # Bytes ahorrados por cada imagen (0 = no sustituida)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        
+        for xref, dpi in image_dpi.items():
+            task = _prepare_image(doc, xref, min(1.0, target_dpi / dpi), jpeg_quality)
+            if task is None:
+                continue
+            pending.append((xref, executor.submit(_encode_jpeg, *task)))
+            
+            # Acotar las imágenes decodificadas en memoria
+            if len(pending) >= 2 * workers:
+                savings.append(_replace_image(doc, *pending.popleft()))
+        
+        while pending:
+            savings.append(_replace_image(doc, *pending.popleft()))
+    
+    return sum(1 for saved in savings if saved), sum(savings)
+
+
+def _prepare_image(doc, xref, scale, jpeg_quality):
+    """Decodifica una imagen apta para JPEG y devuelve los argumentos de _encode_jpeg"""
+    keys = doc.xref_get_keys(xref)
+    if any(key in keys for key in ('ImageMask', 'Mask', 'Decode')):
+        return None  # Máscaras y mapas de decodificación no sobreviven a JPEG
+    if doc.xref_get_key(xref, 'BitsPerComponent') == ('int', '1'):
+        return None  # Escaneos bitonales: CCITT/JBIG2 ya es más compacto
+    
+    pix = fitz.Pixmap(doc, xref)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    
+    mode = 'L' if pix.n == 1 else 'RGB'
+    return pix.samples, pix.width, pix.height, mode, scale, jpeg_quality
+
+
+def _encode_jpeg(samples, width, height, mode, scale, jpeg_quality):
+    """Tarea del pool: reduce la imagen y la codifica en JPEG"""
+    img = Image.frombytes(mode, (width, height), samples)
+    if scale < 1:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        img = img.resize(size, Image.LANCZOS)
+    
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=jpeg_quality, optimize=True)
+    return buffer.getvalue(), img.width, img.height, mode
+
+
+def _replace_image(doc, xref, future):
+    """Sustituye el flujo de la imagen si el JPEG es más pequeño; devuelve los bytes ahorrados"""
+    data, width, height, mode = future.result()
+    original_size = len(doc.xref_stream_raw(xref))
+    if len(data) >= original_size:
+        return 0
+    
+    doc.update_stream(xref, data, compress=0)
+    doc.xref_set_key(xref, 'Filter', '/DCTDecode')
+    doc.xref_set_key(xref, 'DecodeParms', 'null')
+    doc.xref_set_key(xref, 'Width', str(width))
+    doc.xref_set_key(xref, 'Height', str(height))
+    doc.xref_set_key(xref, 'BitsPerComponent', '8')
+    doc.xref_set_key(xref, 'ColorSpace', '/DeviceGray' if mode == 'L' else '/DeviceRGB')
+    return original_size - len(data)
+
+
+# Opciones de guardado de compress_pdf
+COMPRESS_SAVE_OPTIONS = {
+    'garbage': 4,  # Eliminar objetos no usados
+    'deflate': True,  # Comprimir streams
+    'clean': True,  # Limpiar sintaxis
+}
+
+
+def protect_save_options(user_password="", owner_password=""):
+    """
+    Opciones de guardado para cifrar el PDF con contraseña
+    
+    Args:
+        user_password (str): Contraseña para abrir
+        owner_password (str): Contraseña para editar
+    """
+    # Configurar permisos
+    perm = int(
+        fitz.PDF_PERM_ACCESSIBILITY |  # for accessibility only
+        fitz.PDF_PERM_PRINT |  # permit printing
+        fitz.PDF_PERM_COPY  # permit copying
+    )
+    
+    return {
+        'encryption': fitz.PDF_ENCRYPT_AES_256,
+        'user_pw': user_password,
+        'owner_pw': owner_password,
+        'permissions': perm,
+    }
+
+
 class PDFEditor:
     def __init__(self, pdf_path):
         """
         Inicializa el editor con un PDF
         
+        Todas las operaciones aceptan como output_path una ruta, un buffer
+        binario abierto (se escribe en él) o None (devuelven los bytes del
+        PDF resultante en lugar de True).
+        
         Args:
-            pdf_path (str): Ruta del PDF a editar
+            pdf_path (str | bytes | archivo): PDF a editar (ruta, bytes, memoryview
+                o archivo abierto en modo binario)
         """
-        self.pdf_path = pdf_path
-        self.doc = fitz.open(pdf_path)
-        print(f"📝 PDF abierto para edición: {pdf_path}")
+        print(f"📝 PDF abierto para edición: {describe(pdf_path)}")
+        if is_path(pdf_path):
+            self.pdf_path = pdf_path
+            self.doc = fitz.open(pdf_path)
+            self.source_size = None
+        else:
+            data = read_bytes(pdf_path)
+            self.pdf_path = None
+            self.doc = fitz.open(stream=data, filetype="pdf")
+            self.source_size = len(data)
     
     def add_watermark(self, watermark_text, output_path, opacity=0.3, fontsize=60):
         """
@@ -27,42 +461,46 @@ class PDFEditor:
         
         Args:
             watermark_text (str): Texto de la marca de agua
-            output_path (str): Ruta del PDF de salida
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
             opacity (float): Opacidad (0-1)
             fontsize (int): Tamaño de fuente
         """
         try:
-            for page_num in range(len(self.doc)):
-                page = self.doc[page_num]
-                
-                # Obtener dimensiones de la página
-                rect = page.rect
-                
-                # Agregar marca de agua en diagonal
-                text_point = fitz.Point(rect.width / 2, rect.height / 2)
-                
-                # Configurar el texto
-                page.insert_text(
-                    text_point,
-                    watermark_text,
-                    fontsize=fontsize,
-                    rotate=45,
-                    color=(0.7, 0.7, 0.7),
-                    opacity=opacity,
-                    overlay=True
-                )
-                
-                print(f"✅ Marca de agua agregada a página {page_num + 1}")
+            # Marca de agua en diagonal, creada una sola vez
+            self._stamp_watermark(make_text_watermark(watermark_text, opacity=opacity,
+                                                      fontsize=fontsize))
             
-            self.doc.save(output_path)
-            print(f"💧 PDF con marca de agua guardado: {output_path}")
-            return True
+            result = self._save(output_path)
+            print(f"💧 PDF con marca de agua guardado: {describe(output_path)}")
+            return result
             
         except Exception as e:
             print(f"❌ Error al agregar marca de agua: {str(e)}")
             return False
     
-    def add_text(self, page_num, text, x, y, output_path, fontsize=12, color=(0, 0, 0)):
+    def add_image_watermark(self, image_path, output_path, opacity=0.3, scale=1.0):
+        """
+        Agrega una imagen como marca de agua a todas las páginas
+        
+        Args:
+            image_path (str | bytes): Ruta de la imagen o su contenido
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
+            opacity (float): Opacidad (0-1)
+            scale (float): Escala de la imagen (1 px = 1 pt)
+        """
+        try:
+            self._stamp_watermark(make_image_watermark(image_path, opacity=opacity, scale=scale))
+            
+            result = self._save(output_path)
+            print(f"💧 PDF con marca de agua guardado: {describe(output_path)}")
+            return result
+            
+        except Exception as e:
+            print(f"❌ Error al agregar marca de agua: {str(e)}")
+            return False
+    
+    def add_text(self, page_num, text, x, y, output_path, fontsize=12, color=(0, 0, 0),
+                 incremental=False):
         """
         Agrega texto en una posición específica
         
@@ -70,51 +508,37 @@ class PDFEditor:
             page_num (int): Número de página (empieza en 0)
             text (str): Texto a agregar
             x, y (float): Coordenadas
-            output_path (str): PDF de salida
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
             fontsize (int): Tamaño de fuente
             color (tuple): Color RGB (0-1)
+            incremental (bool): Añadir solo los cambios al PDF original (ver _save)
         """
         try:
-            page = self.doc[page_num]
-            
-            page.insert_text(
-                (x, y),
-                text,
-                fontsize=fontsize,
-                color=color
-            )
+            self._insert_text(page_num, text, x, y, fontsize, color)
             
-            self.doc.save(output_path)
-            print(f"✅ Texto agregado en página {page_num + 1}")
-            return True
+            return self._save(output_path, incremental)
             
         except Exception as e:
             print(f"❌ Error al agregar texto: {str(e)}")
             return False
     
-    def add_image(self, page_num, image_path, x, y, width, height, output_path):
+    def add_image(self, page_num, image_path, x, y, width, height, output_path,
+                  incremental=False):
         """
         Inserta una imagen en el PDF
         
         Args:
             page_num (int): Número de página
-            image_path (str): Ruta de la imagen
+            image_path (str | bytes): Ruta de la imagen o su contenido
             x, y (float): Posición
             width, height (float): Dimensiones
-            output_path (str): PDF de salida
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
+            incremental (bool): Añadir solo los cambios al PDF original (ver _save)
         """
         try:
-            page = self.doc[page_num]
+            self._insert_image(page_num, image_path, x, y, width, height)
             
-            # Crear rectángulo para la imagen
-            rect = fitz.Rect(x, y, x + width, y + height)
-            
-            # Insertar imagen
-            page.insert_image(rect, filename=image_path)
-            
-            self.doc.save(output_path)
-            print(f"✅ Imagen agregada en página {page_num + 1}")
-            return True
+            return self._save(output_path, incremental)
             
         except Exception as e:
             print(f"❌ Error al agregar imagen: {str(e)}")
@@ -126,52 +550,60 @@ class PDFEditor:
         
         Args:
             pages_to_delete (list): Lista de números de página (empieza en 0)
-            output_path (str): PDF de salida
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
         """
         try:
-            # Ordenar en orden descendente para no afectar índices
-            pages_to_delete.sort(reverse=True)
-            
-            for page_num in pages_to_delete:
-                if 0 <= page_num < len(self.doc):
-                    self.doc.delete_page(page_num)
-                    print(f"🗑️  Página {page_num + 1} eliminada")
+            self._select_pages(drop=pages_to_delete)
             
-            self.doc.save(output_path)
-            print(f"✅ PDF modificado guardado: {output_path}")
-            return True
+            result = self._save(output_path)
+            print(f"✅ PDF modificado guardado: {describe(output_path)}")
+            return result
             
         except Exception as e:
             print(f"❌ Error al eliminar páginas: {str(e)}")
             return False
     
-    def compress_pdf(self, output_path, quality=1):
+    def select_pages(self, output_path, keep=None, drop=None, predicate=None):
+        """
+        Conserva solo las páginas seleccionadas, reconstruyendo el árbol de páginas una vez
+        
+        Las páginas se indican empezando en 0, como enteros o rangos
+        (p. ej. [0, range(10, 20)]). El resultado conserva el orden original.
+        
+        Args:
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
+            keep (list): Páginas a conservar (None = todas)
+            drop (list): Páginas a eliminar
+            predicate (callable): Función page_num -> bool; se conservan las que devuelven True
+        """
+        try:
+            self._select_pages(keep, drop, predicate)
+            
+            result = self._save(output_path)
+            print(f"✅ PDF modificado guardado: {describe(output_path)}")
+            return result
+            
+        except Exception as e:
+            print(f"❌ Error al seleccionar páginas: {str(e)}")
+            return False
+    
+    def compress_pdf(self, output_path, quality=1, workers=None):
         """
         Comprime el PDF reduciendo calidad de imágenes
         
         Args:
-            output_path (str): PDF de salida
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
             quality (int): 0=baja, 1=media, 2=alta calidad
+            workers (int): Hilos para recomprimir imágenes (None = según núcleos)
         """
         try:
             # quality: 0 = low, 1 = medium, 2 = high
-            self.doc.save(
-                output_path,
-                garbage=4,  # Eliminar objetos no usados
-                deflate=True,  # Comprimir streams
-                clean=True  # Limpiar sintaxis
-            )
-            
-            # Calcular reducción de tamaño
-            original_size = os.path.getsize(self.pdf_path)
-            compressed_size = os.path.getsize(output_path)
-            reduction = (1 - compressed_size/original_size) * 100
+            self._recompress_images(quality, workers)
+            result = self._save(output_path, **COMPRESS_SAVE_OPTIONS)
             
-            print(f"✅ PDF comprimido guardado: {output_path}")
-            print(f"📉 Reducción de tamaño: {reduction:.1f}%")
-            print(f"   Original: {original_size/1024:.1f} KB")
-            print(f"   Comprimido: {compressed_size/1024:.1f} KB")
-            return True
+            print(f"✅ PDF comprimido guardado: {describe(output_path)}")
+            self._report_size(output_path, result)
+            return result
             
         except Exception as e:
             print(f"❌ Error al comprimir: {str(e)}")
@@ -182,74 +614,291 @@ class PDFEditor:
         Protege el PDF con contraseña
         
         Args:
-            output_path (str): PDF de salida
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
             user_password (str): Contraseña para abrir
             owner_password (str): Contraseña para editar
         """
         try:
-            # Configurar permisos
-            perm = int(
-                fitz.PDF_PERM_ACCESSIBILITY |  # for accessibility only
-                fitz.PDF_PERM_PRINT |  # permit printing
-                fitz.PDF_PERM_COPY  # permit copying
-            )
-            
-            self.doc.save(
-                output_path,
-                encryption=fitz.PDF_ENCRYPT_AES_256,
-                user_pw=user_password,
-                owner_pw=owner_password,
-                permissions=perm
-            )
+            result = self._save(output_path, **protect_save_options(user_password, owner_password))
             
-            print(f"🔒 PDF protegido guardado: {output_path}")
-            return True
+            print(f"🔒 PDF protegido guardado: {describe(output_path)}")
+            return result
             
         except Exception as e:
             print(f"❌ Error al proteger PDF: {str(e)}")
             return False
     
-    def extract_images(self, output_folder="extracted_images"):
+    def extract_images(self, output_folder="extracted_images", workers=4):
         """
         Extrae todas las imágenes del PDF
         
+        Cada imagen se escribe una sola vez aunque aparezca en muchas páginas
+        (se deduplica por xref y por hash del contenido). Las escrituras se
+        hacen en un pool de hilos acotado y se guarda un manifest.json que
+        relaciona cada página con sus archivos de imagen.
+        
         Args:
             output_folder (str): Carpeta de salida
+            workers (int): Hilos de escritura
         """
         try:
             os.makedirs(output_folder, exist_ok=True)
             image_count = 0
+            reference_count = 0
+            files_by_xref = {}
+            files_by_hash = {}
+            manifest = {}
             
-            for page_num in range(len(self.doc)):
-                page = self.doc[page_num]
-                image_list = page.get_images()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
                 
-                for img_index, img in enumerate(image_list):
-                    xref = img[0]
-                    base_image = self.doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    image_ext = base_image["ext"]
-                    
-                    image_count += 1
-                    image_path = f"{output_folder}/imagen_{image_count}.{image_ext}"
+                for page_num in range(len(self.doc)):
+                    page = self.doc[page_num]
+                    page_files = []
                     
-                    with open(image_path, "wb") as img_file:
-                        img_file.write(image_bytes)
+                    for img in page.get_images():
+                        xref = img[0]
+                        reference_count += 1
+                        
+                        if xref not in files_by_xref:
+                            base_image = self.doc.extract_image(xref)
+                            image_bytes = base_image["image"]
+                            digest = hashlib.sha256(image_bytes).hexdigest()
+                            
+                            if digest not in files_by_hash:
+                                image_count += 1
+                                filename = f"imagen_{image_count}.{base_image['ext']}"
+                                files_by_hash[digest] = filename
+                                pending.append(executor.submit(
+                                    _write_bytes, f"{output_folder}/{filename}", image_bytes))
+                                print(f"🖼️  Imagen {image_count} extraída")
+                                
+                                # Acotar los bytes pendientes de escribir
+                                if len(pending) >= 2 * workers:
+                                    pending.popleft().result()
+                            
+                            files_by_xref[xref] = files_by_hash[digest]
+                        
+                        page_files.append(files_by_xref[xref])
                     
-                    print(f"🖼️  Imagen {image_count} extraída")
+                    manifest[str(page_num + 1)] = page_files
+                
+                while pending:
+                    pending.popleft().result()
+            
+            with open(f"{output_folder}/manifest.json", "w", encoding="utf-8") as f:
+                json.dump({"images": image_count, "pages": manifest}, f, indent=2)
             
-            print(f"✅ Total de imágenes extraídas: {image_count}")
+            print(f"✅ Total de imágenes extraídas: {image_count} "
+                  f"({reference_count} referencias en el documento)")
             return True
             
         except Exception as e:
             print(f"❌ Error al extraer imágenes: {str(e)}")
             return False
     
+    def pipeline(self):
+        """
+        Crea un pipeline de ediciones que se aplican con una sola escritura
+        
+        Returns:
+            EditPipeline: Pipeline encadenable, ver EditPipeline.run
+        """
+        return EditPipeline(self)
+    
+    def _stamp_watermark(self, wm_doc):
+        page_count = apply_watermark(self.doc, wm_doc)
+        wm_doc.close()
+        print(f"✅ Marca de agua agregada a {page_count} páginas")
+    
+    def _recompress_images(self, quality=1, workers=None):
+        count, saved = recompress_images(self.doc, quality, workers)
+        print(f"🖼️  {count} imágenes recomprimidas ({saved/1024:.1f} KB menos)")
+    
+    def _insert_text(self, page_num, text, x, y, fontsize=12, color=(0, 0, 0)):
+        page = self.doc[page_num]
+        
+        page.insert_text(
+            (x, y),
+            text,
+            fontsize=fontsize,
+            color=color
+        )
+        print(f"✅ Texto agregado en página {page_num + 1}")
+    
+    def _insert_image(self, page_num, image_path, x, y, width, height):
+        page = self.doc[page_num]
+        
+        # Crear rectángulo para la imagen
+        rect = fitz.Rect(x, y, x + width, y + height)
+        
+        # Insertar imagen
+        if is_path(image_path):
+            page.insert_image(rect, filename=image_path)
+        else:
+            page.insert_image(rect, stream=read_bytes(image_path))
+        print(f"✅ Imagen agregada en página {page_num + 1}")
+    
+    def _delete_pages(self, pages_to_delete):
+        self._select_pages(drop=pages_to_delete)
+    
+    def _select_pages(self, keep=None, drop=None, predicate=None):
+        page_count = len(self.doc)
+        selected = _page_set(keep, page_count) if keep is not None else set(range(page_count))
+        selected -= _page_set(drop, page_count)
+        
+        pages = sorted(selected)
+        if predicate is not None:
+            pages = [page_num for page_num in pages if predicate(page_num)]
+        
+        if len(pages) != page_count:
+            _rebuild_page_tree(self.doc, pages)
+        print(f"🗑️  {page_count - len(pages)} páginas eliminadas, {len(pages)} conservadas")
+    
+    def _report_size(self, output_path, result):
+        """Muestra la reducción de tamaño respecto al PDF original"""
+        if isinstance(result, bytes):
+            compressed_size = len(result)
+        elif is_path(output_path):
+            compressed_size = os.path.getsize(output_path)
+        else:
+            return  # Buffer del llamador: no se conoce lo que ya contenía
+        
+        original_size = self.source_size or os.path.getsize(self.pdf_path)
+        reduction = (1 - compressed_size/original_size) * 100
+        
+        print(f"📉 Reducción de tamaño: {reduction:.1f}%")
+        print(f"   Original: {original_size/1024:.1f} KB")
+        print(f"   Comprimido: {compressed_size/1024:.1f} KB")
+    
+    def _save(self, output_path, incremental=False, **options):
+        """
+        Guarda el documento
+        
+        En modo incremental solo se añaden al final del PDF original los
+        objetos modificados, así que el coste depende del tamaño del cambio
+        y no del documento. Solo es posible escribiendo sobre el propio
+        archivo abierto; si el PDF no lo admite, se guarda completo sobre él
+        (ver save_in_place).
+        
+        Args:
+            output_path (str | archivo): PDF de salida: ruta, buffer binario o None
+                para devolver bytes (None o el original en modo incremental)
+            incremental (bool): Guardar de forma incremental
+            **options: Opciones de Document.save (compresión, cifrado...)
+        
+        Returns:
+            bytes si output_path es None (sin modo incremental), True en otro caso
+        """
+        if not incremental:
+            return save_fitz(self.doc, output_path, **options)
+        
+        if self.pdf_path is None:
+            raise ValueError("El guardado incremental necesita un PDF abierto desde disco")
+        if output_path is not None and (
+                not is_path(output_path) or
+                os.path.abspath(output_path) != os.path.abspath(self.pdf_path)):
+            raise ValueError("El guardado incremental solo puede escribir sobre el PDF original")
+        save_in_place(self.doc, self.pdf_path)
+        return True
+    
     def close(self):
         """Cierra el documento"""
         self.doc.close()
 
 
+class EditPipeline:
+    def __init__(self, editor):
+        """
+        Cola de ediciones sobre un PDFEditor que se aplican en una sola pasada
+        
+        Cada método encola una operación y devuelve el pipeline, así que se
+        pueden encadenar. run() aplica todas las operaciones sobre el
+        documento abierto y lo guarda una única vez combinando las opciones
+        de compresión y cifrado pedidas.
+        
+        Args:
+            editor (PDFEditor): Editor con el documento abierto
+        """
+        self.editor = editor
+        self.operations = []
+        self.save_options = {}
+    
+    def add_watermark(self, watermark_text, opacity=0.3, fontsize=60):
+        """Encola una marca de agua de texto (ver PDFEditor.add_watermark)"""
+        self.operations.append(lambda: self.editor._stamp_watermark(
+            make_text_watermark(watermark_text, opacity=opacity, fontsize=fontsize)))
+        return self
+    
+    def add_image_watermark(self, image_path, opacity=0.3, scale=1.0):
+        """Encola una marca de agua de imagen (ver PDFEditor.add_image_watermark)"""
+        self.operations.append(lambda: self.editor._stamp_watermark(
+            make_image_watermark(image_path, opacity=opacity, scale=scale)))
+        return self
+    
+    def add_text(self, page_num, text, x, y, fontsize=12, color=(0, 0, 0)):
+        """Encola texto en una posición (ver PDFEditor.add_text)"""
+        self.operations.append(
+            lambda: self.editor._insert_text(page_num, text, x, y, fontsize, color))
+        return self
+    
+    def add_image(self, page_num, image_path, x, y, width, height):
+        """Encola una imagen en una posición (ver PDFEditor.add_image)"""
+        self.operations.append(
+            lambda: self.editor._insert_image(page_num, image_path, x, y, width, height))
+        return self
+    
+    def delete_pages(self, pages_to_delete):
+        """Encola la eliminación de páginas (ver PDFEditor.delete_pages)"""
+        self.operations.append(lambda: self.editor._delete_pages(pages_to_delete))
+        return self
+    
+    def select_pages(self, keep=None, drop=None, predicate=None):
+        """Encola una selección de páginas (ver PDFEditor.select_pages)"""
+        self.operations.append(lambda: self.editor._select_pages(keep, drop, predicate))
+        return self
+    
+    def compress(self, quality=1, workers=None):
+        """Recomprime las imágenes y guarda comprimido (ver PDFEditor.compress_pdf)"""
+        self.operations.append(lambda: self.editor._recompress_images(quality, workers))
+        self.save_options.update(COMPRESS_SAVE_OPTIONS)
+        return self
+    
+    def protect(self, user_password="", owner_password=""):
+        """Guarda cifrado con contraseña (ver PDFEditor.protect_pdf)"""
+        self.save_options.update(protect_save_options(user_password, owner_password))
+        return self
+    
+    def run(self, output_path):
+        """
+        Aplica las operaciones encoladas y guarda el resultado una sola vez
+        
+        Si termina bien, vacía las operaciones y las opciones de guardado
+        (compresión, cifrado) para que el pipeline se pueda reutilizar.
+        
+        Args:
+            output_path (str | archivo): PDF de salida (ruta, buffer o None para devolver bytes)
+        """
+        try:
+            for operation in self.operations:
+                operation()
+            
+            result = self.editor._save(output_path, **self.save_options)
+            print(f"💾 {len(self.operations)} operaciones guardadas en: {describe(output_path)}")
+            
+            if 'garbage' in self.save_options:
+                self.editor._report_size(output_path, result)
+            
+            # El pipeline queda vacío para reutilizarlo, opciones de guardado incluidas
+            self.operations = []
+            self.save_options = {}
+            return result
+            
+        except Exception as e:
+            print(f"❌ Error al aplicar el pipeline: {str(e)}")
+            return False
+
+
 # Ejemplo de uso
 if __name__ == "__main__":
     editor = PDFEditor("documento.pdf")
@@ -272,7 +921,11 @@ if __name__ == "__main__":
     # Ejemplo 6: Proteger con contraseña
     # editor.protect_pdf("protegido.pdf", user_password="1234", owner_password="admin")
     
-    # Ejemplo 7: Extraer imágenes
+    # Ejemplo 7: Varias ediciones con una sola escritura
+    # editor.pipeline().add_watermark("BORRADOR").add_text(0, "Revisado", 100, 100) \
+    #     .compress().protect(user_password="1234").run("editado.pdf")
+    
+    # Ejemplo 8: Extraer imágenes
     # editor.extract_images("imagenes_del_pdf")
     
     editor.close()
\ No newline at end of file
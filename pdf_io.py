@@ -0,0 +1,205 @@
+"""
+Utilidades para recibir PDFs como ruta, bytes o archivo abierto y devolverlos igual
+"""
+import fitz  # PyMuPDF
+from array import array
+import io
+import os
+
+# Tipos aceptados como contenido de un PDF en memoria
+PDF_BYTES_TYPES = (bytes, bytearray, memoryview)
+
+
+def is_path(source):
+    """Indica si la entrada/salida es una ruta del sistema de archivos"""
+    return isinstance(source, (str, os.PathLike))
+
+
+def describe(source):
+    """Texto para los mensajes: la ruta o una descripción del contenido en memoria"""
+    if source is None:
+        return "memoria"
+    if is_path(source):
+        return str(source)
+    if isinstance(source, PDF_BYTES_TYPES):
+        return f"<{len(source)} bytes en memoria>"
+    return getattr(source, 'name', None) or "<archivo en memoria>"
+
+
+def read_bytes(source):
+    """
+    Devuelve el contenido de una entrada en memoria
+
+    Args:
+        source (bytes | memoryview | archivo): Contenido o archivo abierto en modo binario
+    """
+    if isinstance(source, PDF_BYTES_TYPES):
+        return bytes(source)
+    return source.read()
+
+
+def open_fitz(source):
+    """
+    Abre un PDF con PyMuPDF desde una ruta, bytes o un archivo abierto
+
+    Args:
+        source (str | bytes | memoryview | archivo): PDF de entrada
+    """
+    if is_path(source):
+        return fitz.open(source)
+    return fitz.open(stream=read_bytes(source), filetype="pdf")
+
+
+def pypdf_input(source):
+    """
+    Adapta una entrada para PdfReader / PdfMerger de pypdf
+
+    Args:
+        source (str | bytes | memoryview | archivo): PDF de entrada
+    """
+    if is_path(source):
+        return source
+    if isinstance(source, PDF_BYTES_TYPES):
+        return io.BytesIO(source)
+    return source
+
+
+def save_fitz(doc, target, **options):
+    """
+    Guarda un documento de PyMuPDF en una ruta, en un buffer o como bytes
+
+    Args:
+        doc (fitz.Document): Documento a guardar
+        target (str | archivo | None): Ruta, buffer binario o None para devolver bytes
+        **options: Opciones de Document.save (garbage, deflate, encryption...)
+
+    Returns:
+        bytes si target es None, True en otro caso
+    """
+    if is_path(target):
+        doc.save(target, **options)
+        return True
+
+    data = doc.tobytes(**options)
+    if target is None:
+        return data
+    target.write(data)
+    return True
+
+
+def save_in_place(doc, path):
+    """
+    Guarda un documento de PyMuPDF sobre su propio archivo
+    
+    Si el PDF lo admite solo se añaden al final los objetos modificados.
+    Si no (reparado al abrirlo, linealizado...), se escribe completo en un
+    archivo temporal que sustituye al original.
+    
+    Args:
+        doc (fitz.Document): Documento abierto desde `path`
+        path (str): Ruta del PDF original
+    
+    Returns:
+        bool: True si el guardado fue incremental
+    """
+    if doc.can_save_incrementally():
+        doc.save(path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+        return True
+    
+    print("⚠️  Este PDF no admite guardado incremental: se guarda completo")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    doc.save(tmp_path, encryption=fitz.PDF_ENCRYPT_KEEP)
+    os.replace(tmp_path, path)
+    return False
+
+
+def write_pypdf(writer, target):
+    """
+    Escribe un PdfWriter / PdfMerger de pypdf en una ruta, en un buffer o como bytes
+
+    Args:
+        writer: Objeto con método write(ruta_o_buffer)
+        target (str | archivo | None): Ruta, buffer binario o None para devolver bytes
+
+    Returns:
+        bytes si target es None, True en otro caso
+    """
+    if target is None:
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    writer.write(target)
+    return True
+
+
+class PdfStreamWriter:
+    """
+    Escribe un PDF objeto a objeto directamente en un flujo de salida
+    
+    Cada objeto se escribe en cuanto se crea, así que en memoria solo quedan
+    el desplazamiento de cada objeto y la lista de páginas, que se necesitan
+    para la tabla xref y el árbol de páginas del final.
+    """
+    
+    PAGES_ID = 1
+    CATALOG_ID = 2
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+        self.offsets = array('q', [0, 0])  # Páginas y catálogo se escriben al final
+        self.kids = array('q')
+        self._write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    
+    def reserve(self):
+        """Reserva un número de objeto para escribirlo más adelante"""
+        self.offsets.append(0)
+        return len(self.offsets)
+    
+    def write_object(self, idnum, body):
+        """Escribe un objeto (body son sus bytes ya serializados)"""
+        self.offsets[idnum - 1] = self.position
+        self._write(b"%d 0 obj\n" % idnum)
+        self._write(body)
+        self._write(b"\nendobj\n")
+    
+    def write_stream(self, idnum, entries, data):
+        """
+        Escribe un objeto de flujo sin copiar sus datos
+        
+        Args:
+            idnum (int): Número de objeto
+            entries (bytes): Entradas del diccionario, sin /Length
+            data (bytes): Contenido del flujo, ya codificado
+        """
+        self.offsets[idnum - 1] = self.position
+        self._write(b"%d 0 obj\n<<%s/Length %d>>\nstream\n" % (idnum, entries, len(data)))
+        self._write(data)
+        self._write(b"\nendstream\nendobj\n")
+    
+    def add_page(self, idnum):
+        """Añade al árbol de páginas una página ya escrita (con /Parent PAGES_ID)"""
+        self.kids.append(idnum)
+    
+    def close(self):
+        """Escribe el árbol de páginas, el catálogo, la tabla xref y el trailer"""
+        # El árbol de páginas puede ser enorme: se escribe por trozos
+        self.offsets[self.PAGES_ID - 1] = self.position
+        self._write(b"%d 0 obj\n<</Type/Pages/Count %d/Kids[" % (self.PAGES_ID, len(self.kids)))
+        for start in range(0, len(self.kids), 1024):
+            self._write(b"".join(b"%d 0 R " % kid for kid in self.kids[start:start + 1024]))
+        self._write(b"]>>\nendobj\n")
+        self.write_object(self.CATALOG_ID, b"<</Type/Catalog/Pages %d 0 R>>" % self.PAGES_ID)
+        
+        xref_position = self.position
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self.offsets) + 1))
+        for start in range(0, len(self.offsets), 1024):
+            self._write(b"".join(b"%010d 00000 n \n" % offset
+                                 for offset in self.offsets[start:start + 1024]))
+        self._write(b"trailer\n<</Size %d/Root %d 0 R>>\nstartxref\n%d\n%%%%EOF\n"
+                    % (len(self.offsets) + 1, self.CATALOG_ID, xref_position))
+    
+    def _write(self, data):
+        self.stream.write(data)
+        self.position += len(data)
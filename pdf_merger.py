@@ -1,39 +1,485 @@
 """
 Módulo para fusionar múltiples archivos PDF en uno solo
 """
-from pypdf import PdfMerger, PdfReader
+import fitz  # PyMuPDF
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import (ArrayObject, DictionaryObject, IndirectObject, NullObject,
+                           StreamObject)
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import hashlib
+import io
 import os
+import tempfile
+
+from pdf_io import (PdfStreamWriter, describe, is_path, open_fitz, pypdf_input, read_bytes,
+                    save_fitz, write_pypdf)
+from pdf_parallel import ordered_map, resolve_workers
+
+MERGE_BACKENDS = ('pypdf', 'mupdf')
+
+
+def _append_all(sources, ranges=None):
+    """
+    Fusiona los PDFs en un PdfWriter
+    
+    Se usa PdfWriter.append y no PdfMerger (obsoleto en pypdf 4) porque
+    PdfMerger descarta los marcadores con acciones GoTo, que es como los
+    escribe él mismo: se perderían al volver a fusionar un archivo
+    intermedio. Todas las rutas de fusión con pypdf pasan por aquí, así que
+    los marcadores no dependen de `workers` ni de `dedup`.
+    
+    Args:
+        sources (list): PDFs a fusionar
+        ranges (list): Rangos (inicio, fin) de páginas de cada PDF (None = todas)
+    """
+    writer = PdfWriter()
+    for source, pages in zip(sources, ranges or [None] * len(sources)):
+        writer.append(pypdf_input(source), pages=pages)
+    return writer
+
+
+def _shared_resource_ids(writer):
+    """Números de objeto de los programas de fuente, imágenes y perfiles ICC del writer"""
+    ids = set()
+    for idnum, obj in enumerate(writer._objects, start=1):
+        if isinstance(obj, StreamObject):
+            if obj.get('/Subtype') == '/Image':
+                ids.add(idnum)
+            elif '/N' in obj and '/Type' not in obj and '/Subtype' not in obj:
+                ids.add(idnum)  # Perfil ICC (/ICCBased)
+        elif isinstance(obj, DictionaryObject) and obj.get('/Type') == '/FontDescriptor':
+            for key in ('/FontFile', '/FontFile2', '/FontFile3'):
+                ref = obj.raw_get(key) if key in obj else None
+                if isinstance(ref, IndirectObject):
+                    ids.add(ref.idnum)
+    return ids
+
+
+def _canonical(value, mapping):
+    """Representación de un objeto con las referencias ya deduplicadas, para compararlo"""
+    if isinstance(value, IndirectObject):
+        return f"{mapping.get(value.idnum, value.idnum)} R"
+    if isinstance(value, DictionaryObject):
+        items = (f"{key}:{_canonical(value.raw_get(key), mapping)}"
+                 for key in sorted(dict.keys(value)) if key != '/Length')
+        return "<<" + " ".join(items) + ">>"
+    if isinstance(value, ArrayObject):
+        return "[" + " ".join(_canonical(item, mapping) for item in value) + "]"
+    return repr(value)
+
+
+def _remap(value, mapping, writer):
+    """Sustituye (en el sitio) las referencias a objetos duplicados por las del original"""
+    if isinstance(value, DictionaryObject):
+        # dict.keys: TreeObject (los marcadores) itera sus hijos, no sus claves
+        for key in list(dict.keys(value)):
+            item = value.raw_get(key)
+            if isinstance(item, IndirectObject) and item.idnum in mapping:
+                value[key] = IndirectObject(mapping[item.idnum], 0, writer)
+            else:
+                _remap(item, mapping, writer)
+    elif isinstance(value, ArrayObject):
+        for i, item in enumerate(value):
+            if isinstance(item, IndirectObject) and item.idnum in mapping:
+                value[i] = IndirectObject(mapping[item.idnum], 0, writer)
+            else:
+                _remap(item, mapping, writer)
+
+
+def dedupe_resources(writer):
+    """
+    Comparte entre todos los PDFs fusionados las fuentes, imágenes y perfiles
+    ICC idénticos
+    
+    Cada flujo se identifica por el hash de su contenido y su diccionario
+    (con las referencias ya deduplicadas, de modo que una imagen con la
+    misma máscara también se reconoce). Las referencias a los duplicados
+    pasan a apuntar al primero y los duplicados se vacían, así que no se
+    serializan.
+    
+    Args:
+        writer (PdfWriter): Writer con los PDFs ya añadidos
+        
+    Returns:
+        tuple: (objetos eliminados, bytes ahorrados)
+    """
+    objects = writer._objects
+    pending = _shared_resource_ids(writer)
+    mapping = {}
+    
+    # Varias pasadas: deduplicar máscaras y perfiles ICC puede igualar las imágenes que los usan
+    while True:
+        originals = {}
+        found = False
+        for idnum in sorted(pending):
+            obj = objects[idnum - 1]
+            key = (hashlib.sha256(obj._data).digest(), _canonical(obj, mapping))
+            if key in originals:
+                mapping[idnum] = originals[key]
+                found = True
+            else:
+                originals[key] = idnum
+        pending -= set(mapping)
+        if not found:
+            break
+    
+    saved = 0
+    for obj in objects:
+        _remap(obj, mapping, writer)
+    for idnum in mapping:
+        saved += len(objects[idnum - 1]._data)
+        objects[idnum - 1] = NullObject()  # Se conserva la numeración de la tabla xref
+    
+    return len(mapping), saved
+
+
+def _copy_toc(toc, doc, offset, first, last):
+    """
+    Añade a toc los marcadores de doc que apuntan a las páginas first-last
+    
+    Los números de página se desplazan a su posición en la salida (offset es
+    el índice donde empieza la primera página copiada). Si se descartan
+    marcadores padre, los niveles se ajustan para que la jerarquía siga
+    siendo válida para Document.set_toc.
+    """
+    for level, title, page_num in doc.get_toc():
+        if not first <= page_num - 1 <= last:
+            continue
+        level = min(level, toc[-1][0] + 1 if toc else 1)
+        toc.append([level, title, page_num - first + offset])
+
+
+def _merge_mupdf(parts, target, dedup=False):
+    """
+    Fusiona rangos de páginas con PyMuPDF (Document.insert_pdf)
+    
+    Args:
+        parts (list): Tuplas (fuente, primera, última); última None = hasta el final
+        target (str | archivo | None): Ruta, buffer o None para devolver bytes
+        dedup (bool): Unir los objetos duplicados al guardar, streams incluidos (garbage=4)
+    """
+    doc = fitz.open()
+    toc = []
+    try:
+        for source, first, last in parts:
+            with open_fitz(source) as src:
+                if last is None:
+                    last = len(src) - 1
+                elif last >= len(src):
+                    # Igual que pypdf: un rango fuera del documento es un error
+                    raise ValueError(f"Páginas {first}-{last + 1} fuera de rango en "
+                                     f"{describe(source)} ({len(src)} páginas)")
+                if first > last:
+                    continue  # insert_pdf copiaría el rango al revés
+                offset = len(doc)
+                doc.insert_pdf(src, from_page=first, to_page=last)
+                _copy_toc(toc, src, offset, first, last)
+        if toc:
+            doc.set_toc(toc)
+        return save_fitz(doc, target, garbage=4 if dedup else 1)
+    finally:
+        doc.close()
+
+
+def _merge_batch(sources, output_path, dedup=False, backend='pypdf'):
+    """Tarea de un proceso del pool: fusiona un lote de PDFs en un archivo intermedio"""
+    if backend == 'mupdf':
+        _merge_mupdf([(source, 0, None) for source in sources], output_path, dedup)
+        return output_path
+    
+    writer = _append_all(sources)
+    if dedup:
+        dedupe_resources(writer)
+    writer.write(output_path)
+    writer.close()
+    return output_path
+
+
+class _StreamingPdfWriter(PdfStreamWriter):
+    """
+    Escribe un PDF fusionado objeto a objeto según se leen las fuentes
+    
+    Cada fuente se copia entera (sus páginas y todo lo que alcanzan) con
+    números de objeto nuevos y se escribe de inmediato en la salida; después
+    se puede cerrar. En memoria solo quedan el desplazamiento de cada objeto
+    escrito y la lista de páginas, que se necesitan para la tabla xref y el
+    árbol de páginas del final. Los marcadores y los destinos con nombre de
+    las fuentes no se copian.
+    """
+    
+    def add_source(self, reader):
+        """
+        Copia todas las páginas de un PdfReader a la salida
+        
+        Returns:
+            int: Número de páginas copiadas
+        """
+        mapping = {}  # Número de objeto en la fuente -> número en la salida
+        pending = deque()
+        
+        # Números para todas las páginas antes de nada: las anotaciones y los
+        # enlaces de una página pueden apuntar a otra de la misma fuente
+        pages = list(reader.pages)
+        for page in pages:
+            mapping[page.indirect_reference.idnum] = self.reserve()
+        
+        for page in pages:
+            new_id = mapping[page.indirect_reference.idnum]
+            body = self._serialize_dict(page, mapping, pending, parent=self.PAGES_ID)
+            self.write_object(new_id, body)
+            self.add_page(new_id)
+            
+            # Objetos que alcanza la página y que no se han escrito todavía
+            while pending:
+                ref = pending.popleft()
+                obj = reader.get_object(ref)
+                self.write_object(mapping[ref.idnum], self._serialize(obj, mapping, pending))
+        
+        return len(pages)
+    
+    def _serialize(self, value, mapping, pending):
+        """Bytes de un objeto con las referencias renumeradas; encola los objetos nuevos"""
+        if isinstance(value, IndirectObject):
+            if value.idnum not in mapping:
+                mapping[value.idnum] = self.reserve()
+                pending.append(value)
+            return b"%d 0 R" % mapping[value.idnum]
+        if isinstance(value, StreamObject):
+            data = value._data
+            body = self._serialize_dict(value, mapping, pending, length=len(data))
+            return body + b"\nstream\n" + data + b"\nendstream"
+        if isinstance(value, DictionaryObject):
+            return self._serialize_dict(value, mapping, pending)
+        if isinstance(value, ArrayObject):
+            return b"[" + b" ".join(self._serialize(item, mapping, pending)
+                                    for item in value) + b"]"
+        if value is None:
+            return b"null"
+        
+        buffer = io.BytesIO()
+        value.write_to_stream(buffer)
+        return buffer.getvalue()
+    
+    def _serialize_dict(self, value, mapping, pending, parent=None, length=None):
+        """Bytes de un diccionario, sustituyendo /Parent (páginas) y /Length (flujos)"""
+        parts = [b"<<"]
+        for key in value:
+            if key == '/Parent' and parent is not None or key == '/Length' and length is not None:
+                continue
+            item = self._serialize(value.raw_get(key), mapping, pending)
+            parts.append(self._serialize(key, mapping, pending) + b" " + item)
+        if parent is not None:
+            parts.append(b"/Parent %d 0 R" % parent)
+        if length is not None:
+            parts.append(b"/Length %d" % length)
+        parts.append(b">>")
+        return b"\n".join(parts)
+
+
+def _load_reader(source):
+    """Carga una fuente y su árbol de páginas (se ejecuta por adelantado en un hilo)"""
+    reader = PdfReader(pypdf_input(source))
+    len(reader.pages)
+    return reader
+
 
 class PDFMerger:
-    def __init__(self):
-        self.merger = PdfMerger()
+    def __init__(self, backend='pypdf'):
+        """
+        Inicializa el fusionador
+        
+        No guarda estado entre llamadas: cada operación crea su propio
+        PdfWriter, así que una misma instancia sirve para
+        cualquier número de fusiones.
+        
+        El backend 'mupdf' copia las páginas con PyMuPDF (insert_pdf) en vez
+        de analizar y serializar cada objeto en Python. Conserva los
+        marcadores y, con dedup=True, une al guardar todos los objetos
+        duplicados. stream_merge usa siempre su propio escritor incremental,
+        sea cual sea el backend.
+        
+        Args:
+            backend (str): 'pypdf' o 'mupdf' (ver benchmark.py para elegir)
+        """
+        if backend not in MERGE_BACKENDS:
+            raise ValueError(f"Backend de fusión no soportado: {backend}")
+        self.backend = backend
     
-    def merge_pdfs(self, pdf_list, output_path):
+    def merge_pdfs(self, pdf_list, output_path, workers=1, batch_size=64, temp_dir=None,
+                   dedup=False):
         """
         Fusiona múltiples PDFs en uno solo
         
+        Con `workers` > 1 se hace una fusión en árbol: los procesos del pool
+        fusionan lotes de `batch_size` PDFs en archivos intermedios, que se
+        vuelven a fusionar por lotes nivel a nivel hasta llegar a la salida.
+        Cada proceso solo tiene en memoria los objetos de un lote.
+        
+        Las rutas que no existen se omiten con un aviso; si no queda ningún
+        PDF no se escribe nada y se devuelve False (con ambos backends).
+        
         Args:
-            pdf_list (list): Lista de rutas de archivos PDF a fusionar
-            output_path (str): Ruta del archivo de salida
+            pdf_list (list): PDFs a fusionar: rutas, bytes, memoryview o archivos abiertos
+            output_path (str | archivo): Archivo de salida (ruta, buffer o None para devolver bytes)
+            workers (int): Procesos en paralelo (None = todos los núcleos)
+            batch_size (int): PDFs que fusiona cada tarea en la fusión en árbol
+            temp_dir (str): Carpeta para los archivos intermedios (None = la del sistema)
+            dedup (bool): Compartir entre los PDFs las fuentes, imágenes y perfiles ICC
+                idénticos (ver dedupe_resources; con 'mupdf', cualquier objeto duplicado)
             
         Returns:
-            bool: True si fue exitoso, False en caso contrario
+            bool | bytes: True si fue exitoso (los bytes del PDF si output_path es None),
+            False en caso contrario
         """
+        if resolve_workers(workers) > 1:
+            return self._tree_merge(pdf_list, output_path, resolve_workers(workers),
+                                    max(2, batch_size), temp_dir, dedup)
+        if dedup and self.backend == 'pypdf':
+            # Un único lote: se fusiona en este proceso con PdfWriter y se deduplica
+            return self._tree_merge(pdf_list, output_path, 1, len(pdf_list) or 1, temp_dir,
+                                    dedup)
+        
         try:
+            sources = []
             for pdf_file in pdf_list:
-                if not os.path.exists(pdf_file):
+                if is_path(pdf_file) and not os.path.exists(pdf_file):
                     print(f"⚠️  Archivo no encontrado: {pdf_file}")
                     continue
                     
-                print(f"📄 Agregando: {pdf_file}")
-                self.merger.append(pdf_file)
+                print(f"📄 Agregando: {describe(pdf_file)}")
+                sources.append(pdf_file)
             
-            # Guardar el PDF fusionado
-            self.merger.write(output_path)
-            self.merger.close()
+            if not sources:
+                print("❌ No hay PDFs válidos para fusionar")
+                return False
             
-            print(f"✅ PDF fusionado guardado en: {output_path}")
-            return True
+            if self.backend == 'mupdf':
+                result = _merge_mupdf([(source, 0, None) for source in sources], output_path,
+                                      dedup)
+            else:
+                writer = _append_all(sources)
+                
+                # Guardar el PDF fusionado
+                result = write_pypdf(writer, output_path)
+                writer.close()
+            
+            print(f"✅ PDF fusionado guardado en: {describe(output_path)}")
+            return result
+            
+        except Exception as e:
+            print(f"❌ Error al fusionar PDFs: {str(e)}")
+            return False
+    
+    def _tree_merge(self, pdf_list, output_path, workers, batch_size, temp_dir, dedup=False):
+        """Fusión en árbol repartida entre procesos (ver merge_pdfs)"""
+        try:
+            sources = []
+            for pdf_file in pdf_list:
+                if is_path(pdf_file) and not os.path.exists(pdf_file):
+                    print(f"⚠️  Archivo no encontrado: {pdf_file}")
+                    continue
+                # Los archivos abiertos no se pueden enviar a otro proceso: se leen aquí
+                sources.append(pdf_file if is_path(pdf_file) else read_bytes(pdf_file))
+            
+            if not sources:
+                print("❌ No hay PDFs válidos para fusionar")
+                return False
+            
+            with tempfile.TemporaryDirectory(dir=temp_dir) as work_dir:
+                level = 1
+                while len(sources) > batch_size:
+                    batches = [sources[i:i + batch_size]
+                               for i in range(0, len(sources), batch_size)]
+                    print(f"🌳 Nivel {level}: {len(sources)} PDFs en {len(batches)} lotes")
+                    
+                    tasks = ((batch, os.path.join(work_dir, f"nivel{level}_{num}.pdf"), dedup,
+                              self.backend)
+                             for num, batch in enumerate(batches))
+                    merged = list(ordered_map(_merge_batch, tasks, min(workers, len(batches))))
+                    
+                    # Los intermedios del nivel anterior ya no hacen falta
+                    for source in sources:
+                        if is_path(source) and os.path.dirname(source) == work_dir:
+                            os.remove(source)
+                    sources = merged
+                    level += 1
+                
+                # Último nivel en este proceso, para poder escribir en un buffer
+                if self.backend == 'mupdf':
+                    result = _merge_mupdf([(source, 0, None) for source in sources],
+                                          output_path, dedup)
+                else:
+                    writer = _append_all(sources)
+                    if dedup:
+                        count, saved = dedupe_resources(writer)
+                        print(f"♻️  {count} recursos duplicados compartidos "
+                              f"({saved/1024:.1f} KB menos)")
+                    result = write_pypdf(writer, output_path)
+                    writer.close()
+            
+            print(f"✅ PDF fusionado guardado en: {describe(output_path)}")
+            return result
+            
+        except Exception as e:
+            print(f"❌ Error al fusionar PDFs: {str(e)}")
+            return False
+    
+    def stream_merge(self, pdf_list, output_path, max_open_inputs=4):
+        """
+        Fusiona PDFs escribiendo la salida según avanza, con memoria acotada
+        
+        A diferencia de merge_pdfs, que mantiene todas las fuentes cargadas
+        hasta escribir, cada fuente se serializa en la salida en cuanto se
+        lee y se libera a continuación. Como mucho hay `max_open_inputs`
+        fuentes cargadas a la vez (la actual y las que se leen por adelantado
+        en segundo plano), así que la memoria y los descriptores de archivo
+        no dependen del número de PDFs. No copia los marcadores.
+        
+        Args:
+            pdf_list (iterable): PDFs a fusionar: rutas, bytes, memoryview o archivos abiertos
+            output_path (str | archivo): Archivo de salida (ruta, buffer o None para devolver bytes)
+            max_open_inputs (int): Fuentes cargadas a la vez como máximo
+        """
+        try:
+            if is_path(output_path):
+                output = open(output_path, 'wb')
+            else:
+                output = io.BytesIO() if output_path is None else output_path
+            
+            try:
+                writer = _StreamingPdfWriter(output)
+                file_count = 0
+                
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    loading = deque()
+                    sources = iter(pdf_list)
+                    
+                    while True:
+                        # Leer por adelantado sin pasar del límite de fuentes abiertas
+                        for pdf_file in sources:
+                            if is_path(pdf_file) and not os.path.exists(pdf_file):
+                                print(f"⚠️  Archivo no encontrado: {pdf_file}")
+                                continue
+                            loading.append((pdf_file, executor.submit(_load_reader, pdf_file)))
+                            if len(loading) >= max(1, max_open_inputs):
+                                break
+                        
+                        if not loading:
+                            break
+                        
+                        pdf_file, future = loading.popleft()
+                        page_count = writer.add_source(future.result())
+                        file_count += 1
+                        print(f"📄 Agregado: {describe(pdf_file)} ({page_count} páginas)")
+                
+                writer.close()
+            finally:
+                if is_path(output_path):
+                    output.close()
+            
+            print(f"✅ {file_count} PDFs fusionados en: {describe(output_path)}")
+            return output.getvalue() if output_path is None else True
             
         except Exception as e:
             print(f"❌ Error al fusionar PDFs: {str(e)}")
@@ -43,25 +489,125 @@ class PDFMerger:
         """
         Fusiona páginas específicas de múltiples PDFs
         
+        Los rangos son semiabiertos (la página fin no se incluye). Las rutas
+        que no existen se omiten con un aviso; si no queda ninguna, se
+        devuelve False. Un rango que pasa del final del documento es un
+        error (False), con ambos backends.
+        
         Args:
-            pdf_files_with_pages (list): Lista de tuplas (archivo, inicio, fin)
+            pdf_files_with_pages (list): Lista de tuplas (archivo, inicio, fin); el archivo
+                puede ser una ruta, bytes, memoryview o un archivo abierto
                 Ejemplo: [("doc1.pdf", 0, 2), ("doc2.pdf", 1, 3)]
-            output_path (str): Ruta del archivo de salida
+            output_path (str | archivo): Archivo de salida (ruta, buffer o None para devolver bytes)
         """
         try:
+            parts = []
             for pdf_file, start_page, end_page in pdf_files_with_pages:
-                print(f"📄 Agregando páginas {start_page}-{end_page} de {pdf_file}")
-                self.merger.append(pdf_file, pages=(start_page, end_page))
+                if is_path(pdf_file) and not os.path.exists(pdf_file):
+                    print(f"⚠️  Archivo no encontrado: {pdf_file}")
+                    continue
+                
+                print(f"📄 Agregando páginas {start_page}-{end_page} de {describe(pdf_file)}")
+                parts.append((pdf_file, start_page, end_page))
             
-            self.merger.write(output_path)
-            self.merger.close()
+            if not parts:
+                print("❌ No hay PDFs válidos para fusionar")
+                return False
             
-            print(f"✅ PDF con páginas específicas guardado en: {output_path}")
-            return True
+            if self.backend == 'mupdf':
+                # insert_pdf usa rangos cerrados: la página final se excluye aquí
+                result = _merge_mupdf([(pdf_file, start_page, end_page - 1)
+                                       for pdf_file, start_page, end_page in parts],
+                                      output_path)
+            else:
+                writer = _append_all([pdf_file for pdf_file, _, _ in parts],
+                                     [(start_page, end_page) for _, start_page, end_page in parts])
+                result = write_pypdf(writer, output_path)
+                writer.close()
+            
+            print(f"✅ PDF con páginas específicas guardado en: {describe(output_path)}")
+            return result
             
         except Exception as e:
             print(f"❌ Error: {str(e)}")
             return False
+    
+    def merge_plan(self, plan, output_path):
+        """
+        Fusiona una lista arbitraria de páginas de varios PDFs
+        
+        Las páginas se copian en el orden del plan y pueden repetirse o
+        reordenarse. Cada fuente se abre una sola vez aunque aparezca muchas
+        veces, y solo se cargan las páginas que se usan (y sus recursos, que
+        las repeticiones comparten).
+        
+        Args:
+            plan (list): Tuplas (archivo, páginas). El archivo puede ser una ruta,
+                bytes, memoryview o un archivo abierto; las páginas, una lista de
+                números (empezando en 0) o rangos, o None para todas
+                Ejemplo: [("doc1.pdf", [2, 0, 0]), ("doc2.pdf", range(5)), ("doc1.pdf", [1])]
+            output_path (str | archivo): Archivo de salida (ruta, buffer o None para devolver bytes)
+        """
+        mupdf = self.backend == 'mupdf'
+        writer = fitz.open() if mupdf else PdfWriter()
+        readers = {}  # Una sola lectura por fuente durante esta llamada
+        try:
+            for pdf_file, pages in plan:
+                if is_path(pdf_file) and not os.path.exists(pdf_file):
+                    print(f"⚠️  Archivo no encontrado: {pdf_file}")
+                    continue
+                
+                key = os.path.abspath(pdf_file) if is_path(pdf_file) else id(pdf_file)
+                if key not in readers:
+                    readers[key] = (open_fitz(pdf_file) if mupdf
+                                    else PdfReader(pypdf_input(pdf_file)))
+                reader = readers[key]
+                total = len(reader) if mupdf else len(reader.pages)
+                
+                added = 0
+                for page_num in self._plan_pages(pages, total):
+                    if not 0 <= page_num < total:
+                        print(f"⚠️  Página {page_num} fuera de rango en {describe(pdf_file)}")
+                    elif mupdf:
+                        # final=False conserva la tabla de objetos ya copiados de esta
+                        # fuente: las repeticiones comparten sus recursos
+                        writer.insert_pdf(reader, from_page=page_num, to_page=page_num,
+                                          final=False)
+                        added += 1
+                    else:
+                        writer.add_page(reader.pages[page_num])
+                        added += 1
+                print(f"📄 Agregadas {added} páginas de {describe(pdf_file)}")
+            
+            if mupdf:
+                page_count = len(writer)
+                result = save_fitz(writer, output_path, garbage=1)
+            else:
+                page_count = len(writer.pages)
+                result = write_pypdf(writer, output_path)
+            
+            print(f"✅ PDF con {page_count} páginas guardado en: {describe(output_path)}")
+            return result
+            
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            return False
+        finally:
+            writer.close()
+            if mupdf:
+                for reader in readers.values():
+                    reader.close()
+    
+    def _plan_pages(self, pages, total):
+        """Números de página de una entrada del plan, en orden"""
+        if pages is None:
+            yield from range(total)
+            return
+        for item in pages:
+            if isinstance(item, range):
+                yield from item
+            else:
+                yield item
 
 
 # Ejemplo de uso
@@ -72,10 +618,29 @@ if __name__ == "__main__":
     pdfs_to_merge = ["documento1.pdf", "documento2.pdf", "documento3.pdf"]
     merger.merge_pdfs(pdfs_to_merge, "resultado_fusionado.pdf")
     
+    # Fusionar miles de PDFs repartiendo el trabajo entre todos los núcleos
+    # PDFMerger().merge_pdfs(pdfs_to_merge, "resultado_fusionado.pdf", workers=None)
+    
+    # Decenas de miles de PDFs con memoria y descriptores de archivo acotados
+    # PDFMerger().stream_merge(pdfs_to_merge, "resultado_fusionado.pdf", max_open_inputs=4)
+    
+    # Facturas con las mismas fuentes y logotipo: guardarlos una sola vez
+    # PDFMerger().merge_pdfs(pdfs_to_merge, "facturas.pdf", dedup=True)
+    
+    # Copiar las páginas con PyMuPDF (ver benchmark.py para comparar backends)
+    # PDFMerger(backend='mupdf').merge_pdfs(pdfs_to_merge, "resultado_fusionado.pdf")
+    
     # Ejemplo 2: Fusionar páginas específicas
-    # merger_specific = PDFMerger()
     # pages_config = [
     #     ("doc1.pdf", 0, 2),  # Páginas 0-1 del doc1
     #     ("doc2.pdf", 1, 4)   # Páginas 1-3 del doc2
     # ]
-    # merger_specific.merge_specific_pages(pages_config, "paginas_especificas.pdf")
\ No newline at end of file
+    # merger.merge_specific_pages(pages_config, "paginas_especificas.pdf")
+    
+    # Ejemplo 3: Plan de páginas con repeticiones y cambios de orden
+    # plan = [
+    #     ("doc1.pdf", [2, 0, 0]),   # Página 2 y dos veces la 0 del doc1
+    #     ("doc2.pdf", range(5)),    # Páginas 0-4 del doc2
+    #     ("doc1.pdf", [1]),         # doc1 no se vuelve a abrir
+    # ]
+    # merger.merge_plan(plan, "plan.pdf")
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Utilidades para repartir trabajo de PDFs entre varios procesos
+"""
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import os
+
+
+def resolve_workers(workers):
+    """
+    Normaliza el número de procesos solicitado
+
+    Args:
+        workers (int): Procesos deseados (None o 0 = todos los núcleos)
+    """
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def split_range(start, stop, parts, min_size=1):
+    """
+    Divide el rango [start, stop) en tramos contiguos
+
+    Args:
+        start (int): Inicio del rango
+        stop (int): Fin del rango (exclusivo)
+        parts (int): Número aproximado de tramos
+        min_size (int): Tamaño mínimo de cada tramo
+
+    Returns:
+        list: Lista de tuplas (inicio, fin) en orden
+    """
+    total = stop - start
+    if total <= 0:
+        return []
+    size = max(min_size, -(-total // max(1, parts)))
+    return [(i, min(i + size, stop)) for i in range(start, stop, size)]
+
+
+def ordered_map(func, tasks, workers, initializer=None, initargs=()):
+    """
+    Ejecuta func(*task) en un pool de procesos y devuelve los resultados en orden
+
+    Mantiene como máximo 2 * workers tareas en vuelo, de modo que la memoria
+    no crece con el número de tareas aunque el consumidor sea lento.
+
+    Args:
+        func (callable): Función de nivel de módulo (debe poder serializarse)
+        tasks (iterable): Argumentos de cada tarea (tuplas)
+        workers (int): Número de procesos
+        initializer (callable): Función que se ejecuta al arrancar cada proceso
+        initargs (tuple): Argumentos del initializer
+
+    Yields:
+        Resultado de cada tarea, en el mismo orden que `tasks`
+    """
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                   initargs=initargs)
+    pending = deque()
+    try:
+        for task in tasks:
+            pending.append(executor.submit(func, *task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -14,10 +14,8 @@ import threading
 try:
     from pypdf import PdfMerger, PdfReader, PdfWriter
     import fitz  # PyMuPDF
-    from pdf2image import convert_from_path
-    from PIL import Image
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import letter
+    from pdf_converter import PDFConverter
+    from pdf_editor import make_text_watermark, apply_watermark, recompress_images
 except ImportError as e:
     print(f"Error: {e}")
     print("Instala las dependencias: pip install pypdf PyMuPDF pdf2image Pillow reportlab")
@@ -253,6 +251,13 @@ class PDFToolkitGUI:
         ttk.Spinbox(self.convert_param_frame, from_=72, to=600, increment=50,
                    textvariable=self.dpi_var, width=8).grid(row=3, column=1, sticky=tk.W, padx=5)
         
+        # Motor de renderizado
+        ttk.Label(self.convert_param_frame, text="Motor de renderizado:").grid(row=4, column=0, sticky=tk.W)
+        self.render_backend_var = tk.StringVar(value="poppler")
+        ttk.Combobox(self.convert_param_frame, textvariable=self.render_backend_var, 
+                    values=["poppler", "mupdf"], width=10, 
+                    state='readonly').grid(row=4, column=1, sticky=tk.W, padx=5)
+        
         # Botón ejecutar
         ttk.Button(convert_frame, text="🔄 CONVERTIR", 
                   command=self.execute_convert,
@@ -665,16 +670,19 @@ class PDFToolkitGUI:
                     
                     format_type = self.image_format_var.get()
                     dpi = self.dpi_var.get()
+                    backend = self.render_backend_var.get()
                     
-                    images = convert_from_path(input_file, dpi=dpi)
+                    converter = PDFConverter()
+                    total = 0
                     
-                    for i, image in enumerate(images, 1):
-                        output_path = os.path.join(output_folder, f"pagina_{i}.{format_type.lower()}")
-                        image.save(output_path, format_type)
+                    for i, output_path in enumerate(
+                            converter.iter_images(input_file, output_folder, format_type, dpi,
+                                                  backend=backend), 1):
                         self.log(f"✅ Página {i} convertida a {format_type}")
+                        total = i
                     
-                    self.log(f"🎉 {len(images)} imágenes guardadas en: {output_folder}")
-                    messagebox.showinfo("Éxito", f"PDF convertido a {len(images)} imágenes")
+                    self.log(f"🎉 {total} imágenes guardadas en: {output_folder}")
+                    messagebox.showinfo("Éxito", f"PDF convertido a {total} imágenes")
                     
                 elif mode == "images_to_pdf":
                     # Imágenes a PDF
@@ -688,16 +696,13 @@ class PDFToolkitGUI:
                         
                     self.log("🔄 Convirtiendo imágenes a PDF...")
                     image_paths = input_file.split(';')
-                    images = []
                     
-                    for img_path in image_paths:
-                        img = Image.open(img_path)
-                        if img.mode != 'RGB':
-                            img = img.convert('RGB')
-                        images.append(img)
-                        self.log(f"📷 Imagen cargada: {os.path.basename(img_path)}")
+                    if not PDFConverter().images_to_pdf(image_paths, output_file):
+                        self.log("❌ No se pudo crear el PDF")
+                        messagebox.showerror("Error", "Error al convertir las imágenes a PDF")
+                        return
                     
-                    images[0].save(output_file, save_all=True, append_images=images[1:])
+                    self.log(f"📷 {len(image_paths)} imágenes procesadas")
                     self.log(f"✅ PDF creado: {output_file}")
                     messagebox.showinfo("Éxito", "Imágenes convertidas a PDF")
                     
@@ -712,19 +717,15 @@ class PDFToolkitGUI:
                         return
                         
                     self.log("🔄 Extrayendo texto del PDF...")
-                    doc = fitz.open(input_file)
-                    full_text = []
-                    
-                    for page_num in range(len(doc)):
-                        page = doc[page_num]
-                        text = page.get_text()
-                        full_text.append(f"--- Página {page_num + 1} ---\n{text}\n")
-                        self.log(f"📄 Página {page_num + 1} procesada")
+                    converter = PDFConverter()
                     
                     with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write('\n'.join(full_text))
+                        for page_no, text in converter.iter_text(input_file):
+                            if page_no > 1:
+                                f.write('\n')
+                            f.write(f"--- Página {page_no} ---\n{text}\n")
+                            self.log(f"📄 Página {page_no} procesada")
                     
-                    doc.close()
                     self.log(f"✅ Texto extraído: {output_file}")
                     messagebox.showinfo("Éxito", "Texto extraído del PDF")
                     
@@ -740,25 +741,11 @@ class PDFToolkitGUI:
                         
                     self.log("🔄 Creando PDF desde texto...")
                     
-                    with open(input_file, 'r', encoding='utf-8') as f:
-                        text_content = f.read()
-                    
-                    c = canvas.Canvas(output_file, pagesize=letter)
-                    width, height = letter
-                    c.setFont("Helvetica", 12)
-                    y_position = height - 50
-                    line_height = 15
-                    
-                    for line in text_content.split('\n'):
-                        if y_position < 50:
-                            c.showPage()
-                            c.setFont("Helvetica", 12)
-                            y_position = height - 50
-                        
-                        c.drawString(50, y_position, line[:90])
-                        y_position -= line_height
+                    if not PDFConverter().text_file_to_pdf(input_file, output_file):
+                        self.log("❌ No se pudo crear el PDF")
+                        messagebox.showerror("Error", "Error al crear el PDF desde texto")
+                        return
                     
-                    c.save()
                     self.log(f"✅ PDF creado: {output_file}")
                     messagebox.showinfo("Éxito", "PDF creado desde texto")
                 
@@ -809,21 +796,10 @@ class PDFToolkitGUI:
                     
                     self.log(f"💧 Agregando marca de agua: {watermark_text}")
                     
-                    for page_num in range(len(doc)):
-                        page = doc[page_num]
-                        rect = page.rect
-                        text_point = fitz.Point(rect.width / 2, rect.height / 2)
-                        
-                        page.insert_text(
-                            text_point,
-                            watermark_text,
-                            fontsize=60,
-                            rotate=45,
-                            color=(0.7, 0.7, 0.7),
-                            opacity=opacity,
-                            overlay=True
-                        )
-                        self.log(f"✅ Marca agregada a página {page_num + 1}")
+                    wm_doc = make_text_watermark(watermark_text, opacity=opacity, fontsize=60)
+                    page_count = apply_watermark(doc, wm_doc)
+                    wm_doc.close()
+                    self.log(f"✅ Marca agregada a {page_count} páginas")
                     
                 elif operation == "text":
                     # Agregar texto
@@ -917,6 +893,9 @@ class PDFToolkitGUI:
                 
                 doc = fitz.open(pdf_path)
                 
+                count, saved = recompress_images(doc, quality=self.compression_level.get())
+                self.log(f"🖼️ {count} imágenes recomprimidas ({saved/1024:.1f} KB menos)")
+                
                 doc.save(
                     output_file,
                     garbage=4,
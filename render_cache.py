@@ -0,0 +1,157 @@
+"""
+Caché en disco de páginas renderizadas, direccionada por contenido y con expulsión LRU
+"""
+from collections import OrderedDict
+import hashlib
+import os
+import shutil
+
+
+class RenderCache:
+    def __init__(self, cache_dir="render_cache", max_bytes=1024 ** 3, use_hardlinks=True):
+        """
+        Inicializa la caché de renderizado
+
+        Args:
+            cache_dir (str): Carpeta donde se guardan las páginas renderizadas
+            max_bytes (int): Tamaño máximo de la caché en bytes
+            use_hardlinks (bool): Enlazar (en vez de copiar) las páginas a la salida
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.use_hardlinks = use_hardlinks
+        self.hits = 0
+        self.misses = 0
+        self._hash_memo = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Índice LRU: de la entrada usada hace más tiempo a la más reciente
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        entries = [e for e in os.scandir(cache_dir) if e.is_file() and not e.name.endswith('.tmp')]
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            size = entry.stat().st_size
+            self._entries[entry.name] = size
+            self._total_bytes += size
+
+    def document_hash(self, pdf_path):
+        """
+        Calcula (y memoriza) el hash SHA-256 del contenido de un PDF
+
+        Args:
+            pdf_path (str | bytes): Ruta del PDF o su contenido en memoria
+        """
+        if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+            return hashlib.sha256(pdf_path).hexdigest()
+
+        stat = os.stat(pdf_path)
+        memo_key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._hash_memo:
+            digest = hashlib.sha256()
+            with open(pdf_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            self._hash_memo[memo_key] = digest.hexdigest()
+        return self._hash_memo[memo_key]
+
+    def make_key(self, doc_hash, page_index, dpi, image_format, colorspace='RGB', backend='poppler'):
+        """
+        Construye la clave de una página renderizada
+
+        Args:
+            doc_hash (str): Hash del contenido del documento
+            page_index (int): Índice de la página (empieza en 0)
+            dpi (int): Resolución
+            image_format (str): Formato de imagen
+            colorspace (str): Espacio de color ('RGB' o 'GRAY')
+            backend (str): Motor de renderizado
+        """
+        return (f"{doc_hash}_{page_index}_{dpi}_{colorspace.lower()}_{backend}"
+                f".{image_format.lower()}")
+
+    def fetch(self, key, output_path):
+        """
+        Copia (o enlaza) una página cacheada a la ruta de salida
+
+        Args:
+            key (str): Clave de la página
+            output_path (str): Ruta de destino
+
+        Returns:
+            bool: True si la página estaba en caché
+        """
+        cached_path = os.path.join(self.cache_dir, key)
+        if key not in self._entries or not os.path.exists(cached_path):
+            self._forget(key)
+            self.misses += 1
+            return False
+
+        self._place(cached_path, output_path)
+        self._entries.move_to_end(key)
+        os.utime(cached_path)  # Conserva el orden LRU entre ejecuciones
+        self.hits += 1
+        return True
+
+    def store(self, key, source_path):
+        """
+        Guarda una página recién renderizada en la caché
+
+        Args:
+            key (str): Clave de la página
+            source_path (str): Imagen renderizada
+        """
+        cached_path = os.path.join(self.cache_dir, key)
+        tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, cached_path)
+
+        self._forget(key)
+        size = os.path.getsize(cached_path)
+        self._entries[key] = size
+        self._total_bytes += size
+        self._evict()
+
+    def stats(self):
+        """Devuelve los contadores de aciertos y fallos y el tamaño ocupado"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+        }
+
+    def clear(self):
+        """Vacía la caché"""
+        for key in list(self._entries):
+            self._remove(key)
+
+    def _place(self, cached_path, output_path):
+        """Enlaza o copia una entrada de la caché a su destino"""
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+        if self.use_hardlinks:
+            try:
+                os.link(cached_path, output_path)
+                return
+            except OSError:
+                pass  # Otro sistema de archivos o sin soporte: copiar
+        shutil.copyfile(cached_path, output_path)
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta respetar el tamaño máximo"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._remove(key)
+
+    def _remove(self, key):
+        self._forget(key)
+        try:
+            os.remove(os.path.join(self.cache_dir, key))
+        except FileNotFoundError:
+            pass  # Ya eliminada por otro proceso
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
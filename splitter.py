@@ -2,43 +2,355 @@
 Módulo para dividir archivos PDF de diferentes maneras
 """
 from pypdf import PdfReader, PdfWriter
+import fitz  # PyMuPDF
+import hashlib
+import json
 import os
+import re
+
+from pdf_io import describe, is_path, open_fitz, pypdf_input, read_bytes, save_fitz, write_pypdf
+from pdf_parallel import ordered_map, resolve_workers, split_range
+
+# Partes que escribe como máximo cada tarea del pool (acota la memoria y da progreso fluido)
+_PARTS_PER_TASK = 64
+
+SPLIT_BACKENDS = ('pypdf', 'mupdf')
+
+# Opciones de guardado de cada parte con MuPDF: descarta los recursos que
+# no usan sus páginas y une los objetos duplicados
+MUPDF_PART_OPTIONS = {'garbage': 3}
+
+# Lector del PDF de cada proceso del pool, abierto una sola vez por proceso
+_WORKER_READER = None
+
+
+def _open_reader(source, backend):
+    """Abre el PDF con el backend indicado (PdfReader de pypdf o documento de MuPDF)"""
+    if backend == 'mupdf':
+        return open_fitz(source)
+    return PdfReader(pypdf_input(source))
+
+
+def _open_worker_reader(source, backend):
+    global _WORKER_READER
+    _WORKER_READER = _open_reader(source, backend)
+
+
+def _write_pages(reader, page_numbers, target):
+    """
+    Escribe las páginas indicadas (empezando en 0) como un PDF nuevo
+    
+    Args:
+        reader (PdfReader | fitz.Document): PDF de origen
+        page_numbers (iterable): Páginas en el orden de salida
+        target (str | archivo | None): Ruta, buffer o None para devolver bytes
+            (una selección vacía da un PDF de 0 páginas)
+    """
+    page_numbers = list(page_numbers)
+    
+    # MuPDF no guarda documentos sin páginas: una selección vacía se escribe
+    # con pypdf, así que ambos backends producen un PDF válido de 0 páginas
+    if not isinstance(reader, fitz.Document) or not page_numbers:
+        writer = PdfWriter()
+        for page_num in page_numbers:
+            writer.add_page(reader.pages[page_num])
+        return write_pypdf(writer, target)
+    
+    doc = fitz.open()
+    try:
+        # Un insert_pdf por tramo consecutivo; el mapa de objetos se conserva
+        # entre tramos para no copiar dos veces los recursos compartidos
+        runs = []
+        for page_num in page_numbers:
+            if runs and page_num == runs[-1][1] + 1:
+                runs[-1][1] = page_num
+            else:
+                runs.append([page_num, page_num])
+        for i, (first, last) in enumerate(runs):
+            doc.insert_pdf(reader, from_page=first, to_page=last, final=i == len(runs) - 1)
+        return save_fitz(doc, target, **MUPDF_PART_OPTIONS)
+    finally:
+        doc.close()
+
+
+def _write_part(reader, start, stop, output_folder, filename):
+    """
+    Escribe las páginas [start, stop) como un PDF nuevo
+    
+    Returns:
+        bytes | str: El PDF si output_folder es None; su hash SHA-256 si se
+        escribió en la carpeta
+    """
+    data = _write_pages(reader, range(start, stop), None)
+    if output_folder is None:
+        return data
+    
+    with open(f"{output_folder}/{filename}", "wb") as output_file:
+        output_file.write(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _SplitManifest:
+    """
+    Registro de las partes ya escritas en una carpeta de salida
+    
+    Es un archivo JSON Lines: la primera línea identifica el PDF de origen
+    y cada parte terminada añade una línea con su nombre, su rango de
+    páginas y el hash de su contenido. Como solo se añaden líneas, un
+    proceso interrumpido deja como mucho la última incompleta.
+    """
+    
+    FILENAME = "split_manifest.jsonl"
+    
+    def __init__(self, output_folder, source_hash):
+        self.output_folder = output_folder
+        self.path = os.path.join(output_folder, self.FILENAME)
+        self.completed = self._load_verified(source_hash)
+        
+        # Reescribir solo las entradas verificadas y seguir añadiendo al final
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'source': source_hash}) + "\n")
+            for entry in self.completed.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+    
+    def is_done(self, filename, start, stop):
+        entry = self.completed.get(filename)
+        return entry is not None and (entry['start'], entry['stop']) == (start, stop)
+    
+    def record(self, filename, start, stop, digest):
+        entry = {'file': filename, 'start': start, 'stop': stop, 'sha256': digest}
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+    
+    def close(self):
+        self.file.close()
+    
+    def _load_verified(self, source_hash):
+        """Entradas del manifiesto cuyo archivo existe y conserva el hash registrado"""
+        if not os.path.exists(self.path):
+            return {}
+        
+        entries = {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Línea cortada por una interrupción
+                if line_no == 0:
+                    if entry.get('source') != source_hash:
+                        return {}  # Manifiesto de otro PDF: empezar de cero
+                    continue
+                entries[entry['file']] = entry
+        
+        verified = {}
+        for filename, entry in entries.items():
+            path = os.path.join(self.output_folder, filename)
+            if os.path.exists(path) and _file_hash(path) == entry['sha256']:
+                verified[filename] = entry
+        return verified
+
+
+# Bytes aproximados de la estructura fija de cada PDF (cabecera, catálogo,
+# árbol de páginas, tabla xref y trailer)
+_PDF_BASE_COST = 1024
+
+# Envoltura de cada objeto: "N 0 obj ... endobj" más su entrada en la tabla xref,
+# y de cada flujo: "stream ... endstream"
+_OBJECT_OVERHEAD = 40
+_STREAM_OVERHEAD = 20
+
+# Entrada de cada página en /Kids del árbol de páginas
+_PAGE_OVERHEAD = 10
+
+_REF_PATTERN = re.compile(r"(\d+) \d+ R")
+_PARENT_PATTERN = re.compile(r"/Parent\s*\d+ \d+ R")
+
+
+def _object_cost(doc, xref):
+    """Bytes que ocupa un objeto al escribirlo (diccionario más flujo sin recomprimir)"""
+    text = doc.xref_object(xref, compressed=True)
+    # pypdf separa cada nombre y cada array con espacios o saltos de línea
+    cost = len(text) + text.count('/') + 2 * text.count('[') + _OBJECT_OVERHEAD
+    if doc.xref_is_stream(xref):
+        cost += _STREAM_OVERHEAD
+        kind, value = doc.xref_get_key(xref, "Length")
+        try:
+            if kind == 'int':
+                cost += int(value)
+            elif kind == 'xref':
+                cost += int(doc.xref_object(int(value.split()[0])))
+            else:
+                raise ValueError(value)
+        except ValueError:
+            cost += len(doc.xref_stream_raw(xref))
+    return cost
+
+
+def _page_objects(doc, page_xref, page_xrefs, refs):
+    """
+    Objetos que hay que copiar para escribir una página: ella misma y todo
+    lo que alcanza (contenido, recursos, fuentes, imágenes, anotaciones...)
+    
+    No se siguen /Parent ni las referencias a otras páginas (destinos de
+    enlaces, /P de las anotaciones), que no se copian con la página.
+    
+    Args:
+        doc (fitz.Document): PDF de origen
+        page_xref (int): xref de la página
+        page_xrefs (set): xrefs de todas las páginas
+        refs (dict): Memo xref -> referencias del objeto, compartido entre páginas
+    """
+    stack = [page_xref]
+    
+    # Recursos heredados del árbol de páginas, sin recorrer los nodos del árbol
+    node = page_xref
+    kind, value = doc.xref_get_key(node, "Resources")
+    while kind == 'null':
+        kind, value = doc.xref_get_key(node, "Parent")
+        if kind != 'xref':
+            break
+        node = int(value.split()[0])
+        kind, value = doc.xref_get_key(node, "Resources")
+        stack.extend(int(ref) for ref in _REF_PATTERN.findall(value))
+    
+    seen = set(stack)
+    xref_count = doc.xref_length()
+    while stack:
+        xref = stack.pop()
+        if xref not in refs:
+            text = _PARENT_PATTERN.sub('', doc.xref_object(xref, compressed=True))
+            refs[xref] = [int(ref) for ref in _REF_PATTERN.findall(text)]
+        
+        for ref in refs[xref]:
+            if ref not in seen and ref not in page_xrefs and 0 < ref < xref_count:
+                seen.add(ref)
+                stack.append(ref)
+    
+    return seen
+
+
+def _pack_by_size(doc, max_bytes):
+    """
+    Agrupa páginas consecutivas en tramos cuyo tamaño estimado no pasa de max_bytes
+    
+    Recorre el documento una sola vez: cada página suma el coste de los
+    objetos que todavía no están en el tramo actual, así que los recursos
+    compartidos (fuentes, imágenes de fondo...) solo se cuentan una vez
+    por tramo.
+    
+    Returns:
+        list: Tuplas (inicio, fin, bytes estimados), con fin exclusivo
+    """
+    page_xrefs = [doc.page_xref(page_num) for page_num in range(len(doc))]
+    all_pages = set(page_xrefs)
+    refs = {}
+    costs = {}
+    ranges = []
+    start = 0
+    chunk_objects = set()
+    chunk_size = _PDF_BASE_COST
+    
+    for page_num, page_xref in enumerate(page_xrefs):
+        page_objects = _page_objects(doc, page_xref, all_pages, refs)
+        new_objects = page_objects - chunk_objects
+        added = _PAGE_OVERHEAD
+        for xref in new_objects:
+            if xref not in costs:
+                costs[xref] = _object_cost(doc, xref)
+            added += costs[xref]
+        
+        if chunk_objects and chunk_size + added > max_bytes:
+            ranges.append((start, page_num, chunk_size))
+            start = page_num
+            chunk_objects = page_objects
+            chunk_size = _PDF_BASE_COST + _PAGE_OVERHEAD + sum(costs[xref] for xref in page_objects)
+        else:
+            chunk_objects |= new_objects
+            chunk_size += added
+    
+    if len(page_xrefs) > start:
+        ranges.append((start, len(page_xrefs), chunk_size))
+    return ranges
+
+
+def _safe_filename(title):
+    """Convierte el título de un marcador en un nombre de archivo válido"""
+    name = re.sub(r'[^\w\- ]+', '_', title).strip(' _')
+    return name[:80] or "capitulo"
+
+
+def _write_parts(parts, output_folder):
+    """Tarea de un proceso del pool: escribe varias partes (nombre, inicio, fin)"""
+    return [_write_part(_WORKER_READER, start, stop, output_folder, filename)
+            for filename, start, stop in parts]
+
 
 class PDFSplitter:
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, backend='pypdf'):
         """
         Inicializa el divisor con un archivo PDF
         
+        Con output_folder=None los métodos de división no escriben en disco y
+        devuelven los PDFs resultantes como bytes.
+        
+        El backend 'mupdf' copia las páginas con PyMuPDF (insert_pdf) en vez
+        de analizar y serializar cada objeto en Python, y limpia en cada
+        parte los recursos que sus páginas no usan.
+        
         Args:
-            pdf_path (str): Ruta del archivo PDF a dividir
+            pdf_path (str | bytes | archivo): PDF a dividir (ruta, bytes, memoryview
+                o archivo abierto en modo binario)
+            backend (str): 'pypdf' o 'mupdf'
         """
-        self.pdf_path = pdf_path
-        self.reader = PdfReader(pdf_path)
-        self.total_pages = len(self.reader.pages)
-        print(f"📖 PDF cargado: {pdf_path} ({self.total_pages} páginas)")
+        if backend not in SPLIT_BACKENDS:
+            raise ValueError(f"Backend de división no soportado: {backend}")
+        
+        # Los archivos abiertos se leen una vez: los procesos del pool reciben los bytes
+        self.pdf_path = pdf_path if is_path(pdf_path) else read_bytes(pdf_path)
+        self.backend = backend
+        self.reader = _open_reader(self.pdf_path, backend)
+        self._hash = None
+        self.total_pages = len(self.reader) if backend == 'mupdf' else len(self.reader.pages)
+        print(f"📖 PDF cargado: {describe(pdf_path)} ({self.total_pages} páginas)")
     
-    def split_by_page(self, output_folder="split_output"):
+    def split_by_page(self, output_folder="split_output", workers=1, resume=False):
         """
         Divide el PDF en archivos individuales (una página por archivo)
         
         Args:
             output_folder (str): Carpeta donde guardar los archivos
+                (None = devolver una lista con los bytes de cada página)
+            workers (int): Procesos en paralelo (None = todos los núcleos)
+            resume (bool): Llevar un manifiesto en la carpeta y omitir las partes que
+                una ejecución anterior con resume=True ya escribió y conservan su hash
         """
         try:
-            os.makedirs(output_folder, exist_ok=True)
+            outputs = self._prepare_outputs(output_folder)
+            parts = [(f"pagina_{page_num + 1}.pdf", page_num, page_num + 1)
+                     for page_num in range(self.total_pages)]
             
-            for page_num in range(self.total_pages):
-                writer = PdfWriter()
-                writer.add_page(self.reader.pages[page_num])
-                
-                output_filename = f"{output_folder}/pagina_{page_num + 1}.pdf"
-                with open(output_filename, "wb") as output_file:
-                    writer.write(output_file)
-                
+            results = self._iter_parts(parts, output_folder, workers, resume)
+            for page_num, data in enumerate(results):
+                if outputs is not None:
+                    outputs.append(data)
+                elif data is None:
+                    continue  # Ya escrita en una ejecución anterior
                 print(f"✅ Página {page_num + 1} guardada")
             
-            print(f"🎉 Todas las páginas divididas en: {output_folder}")
-            return True
+            print(f"🎉 Todas las páginas divididas en: {describe(output_folder)}")
+            return True if outputs is None else outputs
             
         except Exception as e:
             print(f"❌ Error al dividir: {str(e)}")
@@ -52,56 +364,168 @@ class PDFSplitter:
             ranges (list): Lista de tuplas (inicio, fin, nombre)
                 Ejemplo: [(0, 3, "introduccion"), (3, 10, "capitulo1")]
             output_folder (str): Carpeta de salida
+                (None = devolver un diccionario {nombre: bytes})
         """
         try:
-            os.makedirs(output_folder, exist_ok=True)
+            outputs = self._prepare_outputs(output_folder)
             
+            named = {}
             for start, end, name in ranges:
-                writer = PdfWriter()
+                if start >= min(end, self.total_pages):
+                    print(f"⚠️  Rango {start}-{end} sin páginas: {name}.pdf quedará vacío")
                 
                 # Agregar páginas del rango
-                for page_num in range(start, min(end, self.total_pages)):
-                    writer.add_page(self.reader.pages[page_num])
-                
-                output_filename = f"{output_folder}/{name}.pdf"
-                with open(output_filename, "wb") as output_file:
-                    writer.write(output_file)
+                data = _write_part(self.reader, start, min(end, self.total_pages),
+                                   output_folder, f"{name}.pdf")
+                named[name] = data
                 
                 print(f"✅ Rango {start}-{end} guardado como: {name}.pdf")
             
-            return True
+            return True if outputs is None else named
+            
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            return False
+    
+    def split_by_outline(self, level=1, output_folder="split_outline", workers=1, resume=False):
+        """
+        Divide el PDF en un archivo por capítulo según sus marcadores
+        
+        Cada marcador de nivel menor o igual que `level` abre una parte que
+        llega hasta el siguiente. Con backend='mupdf' solo se cargan los
+        marcadores y las páginas de cada parte cuando se escribe, así que la
+        memoria depende del capítulo más grande y no del documento; con
+        'pypdf', PdfReader lee el archivo entero y carga todo el árbol de
+        páginas al acceder a la primera. Las páginas anteriores al primer
+        marcador (portada, índice...) van a una parte "inicio".
+        
+        Args:
+            level (int): Nivel máximo de los marcadores que abren una parte (1 = capítulos)
+            output_folder (str): Carpeta de salida
+                (None = devolver un diccionario {nombre: bytes})
+            workers (int): Procesos en paralelo (None = todos los núcleos)
+            resume (bool): Llevar un manifiesto en la carpeta y omitir las partes que
+                una ejecución anterior con resume=True ya escribió y conservan su hash
+        """
+        try:
+            if self.backend == 'mupdf':
+                toc = self.reader.get_toc()
+            else:
+                with open_fitz(self.pdf_path) as doc:
+                    toc = doc.get_toc()
+            
+            # Inicio de cada capítulo; si varios empiezan en la misma página, vale el primero
+            starts = []
+            for entry_level, title, page_no in toc:
+                if entry_level <= level and 1 <= page_no <= self.total_pages:
+                    if not starts or page_no - 1 > starts[-1][0]:
+                        starts.append((page_no - 1, title))
+            
+            if not starts:
+                raise ValueError(f"El PDF no tiene marcadores de nivel 1 a {level}")
+            if starts[0][0] > 0:
+                starts.insert(0, (0, "inicio"))
+            
+            width = len(str(len(starts)))
+            names = [f"{num:0{width}d}_{_safe_filename(title)}"
+                     for num, (_, title) in enumerate(starts, start=1)]
+            stops = [start for start, _ in starts[1:]] + [self.total_pages]
+            parts = [(f"{name}.pdf", start, stop)
+                     for name, (start, _), stop in zip(names, starts, stops)]
+            
+            outputs = self._prepare_outputs(output_folder)
+            named = {}
+            results = self._iter_parts(parts, output_folder, workers, resume)
+            for name, (_, start, stop), data in zip(names, parts, results):
+                named[name] = data
+                if data is None:
+                    continue  # Ya escrito en una ejecución anterior
+                print(f"✅ Capítulo {start + 1}-{stop} guardado como: {name}.pdf")
+            
+            print(f"🎉 {len(parts)} capítulos divididos en: {describe(output_folder)}")
+            return True if outputs is None else named
             
         except Exception as e:
             print(f"❌ Error: {str(e)}")
             return False
     
-    def split_by_chunks(self, pages_per_chunk, output_folder="split_chunks"):
+    def split_by_chunks(self, pages_per_chunk, output_folder="split_chunks", workers=1,
+                        resume=False):
         """
         Divide el PDF en fragmentos de N páginas
         
         Args:
             pages_per_chunk (int): Número de páginas por fragmento
             output_folder (str): Carpeta de salida
+                (None = devolver una lista con los bytes de cada fragmento)
+            workers (int): Procesos en paralelo (None = todos los núcleos)
+            resume (bool): Llevar un manifiesto en la carpeta y omitir las partes que
+                una ejecución anterior con resume=True ya escribió y conservan su hash
         """
         try:
-            os.makedirs(output_folder, exist_ok=True)
+            outputs = self._prepare_outputs(output_folder)
+            parts = [(f"fragmento_{chunk_num}.pdf", i, min(i + pages_per_chunk, self.total_pages))
+                     for chunk_num, i in enumerate(
+                         range(0, self.total_pages, pages_per_chunk), start=1)]
             
-            chunk_num = 1
-            for i in range(0, self.total_pages, pages_per_chunk):
-                writer = PdfWriter()
-                
-                # Agregar páginas del fragmento actual
-                for page_num in range(i, min(i + pages_per_chunk, self.total_pages)):
-                    writer.add_page(self.reader.pages[page_num])
-                
-                output_filename = f"{output_folder}/fragmento_{chunk_num}.pdf"
-                with open(output_filename, "wb") as output_file:
-                    writer.write(output_file)
-                
-                print(f"✅ Fragmento {chunk_num} guardado ({i+1}-{min(i+pages_per_chunk, self.total_pages)})")
-                chunk_num += 1
+            results = self._iter_parts(parts, output_folder, workers, resume)
+            for chunk_num, ((_, start, stop), data) in enumerate(zip(parts, results), start=1):
+                if outputs is not None:
+                    outputs.append(data)
+                elif data is None:
+                    continue  # Ya escrito en una ejecución anterior
+                print(f"✅ Fragmento {chunk_num} guardado ({start + 1}-{stop})")
             
-            return True
+            return True if outputs is None else outputs
+            
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            return False
+    
+    def split_by_size(self, max_bytes, output_folder="split_size", workers=1, resume=False):
+        """
+        Divide el PDF en partes de páginas consecutivas que no superan max_bytes
+        
+        El tamaño de cada parte se estima antes de escribirla a partir de
+        los objetos que alcanza cada página (contenido, fuentes, imágenes...),
+        contando una sola vez por parte los recursos compartidos. No se
+        escriben ni se miden archivos de prueba. Una página que por sí sola
+        supera el límite se guarda en su propia parte.
+        
+        Args:
+            max_bytes (int): Tamaño máximo de cada parte en bytes
+            output_folder (str): Carpeta de salida
+                (None = devolver una lista con los bytes de cada parte)
+            workers (int): Procesos en paralelo (None = todos los núcleos)
+            resume (bool): Llevar un manifiesto en la carpeta y omitir las partes que
+                una ejecución anterior con resume=True ya escribió y conservan su hash
+        """
+        try:
+            outputs = self._prepare_outputs(output_folder)
+            
+            if self.backend == 'mupdf':
+                ranges = _pack_by_size(self.reader, max_bytes)
+            else:
+                with open_fitz(self.pdf_path) as doc:
+                    ranges = _pack_by_size(doc, max_bytes)
+            
+            parts = [(f"parte_{part_num}.pdf", start, stop)
+                     for part_num, (start, stop, _) in enumerate(ranges, start=1)]
+            
+            results = self._iter_parts(parts, output_folder, workers, resume)
+            for part_num, ((start, stop, estimate), data) in enumerate(zip(ranges, results),
+                                                                         start=1):
+                if outputs is not None:
+                    outputs.append(data)
+                elif data is None:
+                    continue  # Ya escrita en una ejecución anterior
+                warning = "  ⚠️  supera el límite" if estimate > max_bytes else ""
+                print(f"✅ Parte {part_num} guardada ({start + 1}-{stop}, "
+                      f"~{estimate/1024:.1f} KB){warning}")
+            
+            print(f"🎉 {len(parts)} partes de hasta {max_bytes/1024/1024:.1f} MB en: "
+                  f"{describe(output_folder)}")
+            return True if outputs is None else outputs
             
         except Exception as e:
             print(f"❌ Error: {str(e)}")
@@ -113,27 +537,100 @@ class PDFSplitter:
         
         Args:
             page_numbers (list): Lista de números de página (empezando en 1)
-            output_path (str): Ruta del archivo de salida
+            output_path (str | archivo): Archivo de salida (ruta, buffer o None para devolver bytes)
         """
         try:
-            writer = PdfWriter()
+            selected = []
             
             for page_num in page_numbers:
                 if 1 <= page_num <= self.total_pages:
-                    writer.add_page(self.reader.pages[page_num - 1])
+                    selected.append(page_num - 1)
                     print(f"📄 Página {page_num} agregada")
                 else:
                     print(f"⚠️  Página {page_num} fuera de rango")
             
-            with open(output_path, "wb") as output_file:
-                writer.write(output_file)
+            if not selected:
+                print("⚠️  Ninguna página seleccionada: se guardará un PDF vacío")
+            result = _write_pages(self.reader, selected, output_path)
             
-            print(f"✅ Páginas extraídas guardadas en: {output_path}")
-            return True
+            print(f"✅ Páginas extraídas guardadas en: {describe(output_path)}")
+            return result
             
         except Exception as e:
             print(f"❌ Error: {str(e)}")
             return False
+    
+    def _prepare_outputs(self, output_folder):
+        """Crea la carpeta de salida o, sin carpeta, la lista donde acumular los bytes"""
+        if output_folder is None:
+            return []
+        os.makedirs(output_folder, exist_ok=True)
+        return None
+    
+    def _iter_parts(self, parts, output_folder, workers, resume=False):
+        """
+        Escribe las partes (nombre, inicio, fin), en serie o repartidas entre procesos
+        
+        Con varios procesos cada uno abre su propio lector del PDF una sola
+        vez y recibe lotes contiguos de partes; los resultados se devuelven
+        en el mismo orden que `parts`.
+        
+        Con `resume` se lleva en la carpeta un manifiesto de las partes
+        terminadas (ver _SplitManifest) y se omiten las que ya figuran en él
+        con el mismo rango y cuyo archivo conserva el hash. Sin `resume` no
+        se calcula el hash del origen ni se escribe el manifiesto.
+        
+        Yields:
+            bytes | str | None: El PDF de cada parte, su hash si se escribió en la
+            carpeta, o None si se omitió por estar ya completa
+        """
+        if resume and output_folder is None:
+            raise ValueError("Para reanudar hace falta una carpeta de salida")
+        if not resume:
+            yield from self._write_parts(parts, output_folder, workers)
+            return
+        
+        manifest = _SplitManifest(output_folder, self._source_hash())
+        try:
+            pending = [part for part in parts if not manifest.is_done(*part)]
+            if len(pending) < len(parts):
+                print(f"⏭️  {len(parts) - len(pending)} partes ya completas, "
+                      f"se reanuda con {len(pending)} pendientes")
+            
+            results = self._write_parts(pending, output_folder, workers)
+            for part in parts:
+                if manifest.is_done(*part):
+                    yield None
+                    continue
+                digest = next(results)
+                manifest.record(*part, digest)
+                yield digest
+        finally:
+            manifest.close()
+    
+    def _write_parts(self, parts, output_folder, workers):
+        """Escribe las partes en orden, en este proceso o en un pool de procesos"""
+        workers = min(resolve_workers(workers), len(parts) or 1)
+        if workers == 1:
+            for filename, start, stop in parts:
+                yield _write_part(self.reader, start, stop, output_folder, filename)
+            return
+        
+        batches = split_range(0, len(parts), max(workers * 4, -(-len(parts) // _PARTS_PER_TASK)))
+        tasks = ((parts[first:last], output_folder) for first, last in batches)
+        
+        for results in ordered_map(_write_parts, tasks, workers, initializer=_open_worker_reader,
+                                   initargs=(self.pdf_path, self.backend)):
+            yield from results
+    
+    def _source_hash(self):
+        """Hash SHA-256 del PDF de origen, para reconocer su manifiesto"""
+        if self._hash is None:
+            if is_path(self.pdf_path):
+                self._hash = _file_hash(self.pdf_path)
+            else:
+                self._hash = hashlib.sha256(self.pdf_path).hexdigest()
+        return self._hash
 
 
 # Ejemplo de uso
@@ -142,6 +639,8 @@ if __name__ == "__main__":
     
     # Opción 1: Dividir en páginas individuales
     # splitter.split_by_page("paginas_individuales")
+    # splitter.split_by_page("paginas_individuales", workers=None)  # Todos los núcleos
+    # splitter.split_by_page("paginas_individuales", resume=True)  # Reanudable tras un corte
     
     # Opción 2: Dividir por rangos personalizados
     rangos = [
@@ -154,5 +653,14 @@ if __name__ == "__main__":
     # Opción 3: Dividir en fragmentos de 3 páginas
     splitter.split_by_chunks(3, "fragmentos")
     
-    # Opción 4: Extraer páginas específicas
-    # splitter.extract_pages([1, 3, 5, 7], "paginas_impares.pdf")
\ No newline at end of file
+    # Opción 4: Dividir en partes de 10 MB como máximo
+    # splitter.split_by_size(10 * 1024 * 1024, "partes")
+    
+    # Opción 5: Un archivo por capítulo según los marcadores
+    # splitter.split_by_outline(level=1, output_folder="capitulos")
+    
+    # Opción 6: Extraer páginas específicas
+    # splitter.extract_pages([1, 3, 5, 7], "paginas_impares.pdf")
+    
+    # Opción 7: Dividir con PyMuPDF (mucho más rápido en documentos grandes)
+    # PDFSplitter("documento_grande.pdf", backend='mupdf').split_by_page("paginas")
\ No newline at end of file